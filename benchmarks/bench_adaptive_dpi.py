@@ -0,0 +1,52 @@
+import os
+import sys
+import argparse
+import difflib
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fitz
+from pdf_to_docx import OCR_ENGINES, OCRProcessor, choose_page_dpi, render_pdf_page
+from synthetic import build_born_digital_document, scan_document
+FONT_SIZES = (8, 10, 12, 16, 24)
+def make_corpus(pages_per_size):
+    source = fitz.open()
+    for size in FONT_SIZES:
+        document = build_born_digital_document(pages_per_size, font_size=size, seed=size)
+        source.insert_pdf(document)
+        document.close()
+    return source, scan_document(source, dpi=300, skew_degrees=0, noise=0)
+def normalize(text):
+    return ' '.join(text.split())
+def run(processor, process_func, scanned, truths, dpi_mode):
+    started = time.perf_counter()
+    pixels = 0
+    accuracy = []
+    for page, truth in zip(scanned, truths):
+        dpi = choose_page_dpi(page) if dpi_mode == 'auto' else dpi_mode
+        image = render_pdf_page(page, dpi)
+        pixels += image.shape[0] * image.shape[1]
+        page_data = processor.recognize_page(process_func, image)
+        blocks = sorted(page_data['text_blocks'], key=lambda block: block['coordinates'][0][1])
+        text = normalize(' '.join(block['text'] for block in blocks))
+        accuracy.append(difflib.SequenceMatcher(None, truth, text).ratio())
+    return time.perf_counter() - started, pixels, sum(accuracy) / len(accuracy)
+def main():
+    parser = argparse.ArgumentParser(description="Точность и время OCR: фиксированный DPI против адаптивного")
+    parser.add_argument("--engine", choices=OCR_ENGINES, default="PaddleOCR")
+    parser.add_argument("--pages-per-size", type=int, default=2)
+    parser.add_argument("--fixed-dpi", type=int, default=300)
+    args = parser.parse_args()
+    source, scanned = make_corpus(args.pages_per_size)
+    truths = [normalize(page.get_text()) for page in source]
+    processor = OCRProcessor()
+    process_func = processor.get_process_func(args.engine)
+    results = {}
+    for mode in (args.fixed_dpi, 'auto'):
+        results[mode] = run(processor, process_func, scanned, truths, mode)
+        elapsed, pixels, accuracy = results[mode]
+        print(f"DPI {str(mode):>5}: {elapsed:7.2f} с  {pixels / 1e6:8.1f} Мпикс  точность {accuracy * 100:6.2f}%")
+    fixed, adaptive = results[args.fixed_dpi], results['auto']
+    print(f"ускорение {fixed[0] / adaptive[0]:.2f}x, изменение точности {(adaptive[2] - fixed[2]) * 100:+.2f} п.п.")
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+import os
+import sys
+import argparse
+import asyncio
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_to_docx import AsyncConverter, convert
+from run_benchmarks import StubOCRProcessor
+from synthetic import make_born_digital_pdf, make_scanned_pdf
+class DelayedOCRProcessor(StubOCRProcessor):
+    delay = 0.0
+    def _process_with_stub(self, image):
+        time.sleep(self.delay)
+        return super()._process_with_stub(image)
+def make_documents(work_dir, documents, pages):
+    paths = []
+    for i in range(documents):
+        path = os.path.join(work_dir, f"doc_{i}.pdf")
+        if i % 2:
+            make_born_digital_pdf(path, pages, seed=i, with_images=True)
+        else:
+            make_scanned_pdf(path, pages, seed=i)
+        paths.append(path)
+    return paths
+async def run_async(paths, work_dir, args):
+    async with AsyncConverter(DelayedOCRProcessor(), dpi=args.dpi, max_jobs=args.max_jobs,
+                              io_workers=args.io_workers) as converter:
+        jobs = [await converter.submit(path, os.path.join(work_dir, f"async_{i}.docx"))
+                for i, path in enumerate(paths)]
+        for job in jobs:
+            await job.wait()
+def main():
+    parser = argparse.ArgumentParser(description="Последовательный convert() против AsyncConverter на нескольких документах")
+    parser.add_argument("--documents", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--max-jobs", type=int, default=4)
+    parser.add_argument("--io-workers", type=int, default=4)
+    parser.add_argument("--ocr-delay", type=float, default=0.1,
+                        help="имитация времени инференса на страницу, с (освобождает GIL, как настоящие движки)")
+    args = parser.parse_args()
+    DelayedOCRProcessor.delay = args.ocr_delay
+    with tempfile.TemporaryDirectory() as work_dir:
+        paths = make_documents(work_dir, args.documents, args.pages)
+        total_pages = args.documents * args.pages
+        started = time.perf_counter()
+        for i, path in enumerate(paths):
+            convert(path, os.path.join(work_dir, f"sequential_{i}.docx"),
+                    ocr_processor=DelayedOCRProcessor(), dpi=args.dpi)
+        sequential = time.perf_counter() - started
+        print(f"последовательно: {sequential:7.2f} с  {total_pages / sequential:7.1f} стр/с")
+        started = time.perf_counter()
+        asyncio.run(run_async(paths, work_dir, args))
+        concurrent = time.perf_counter() - started
+        print(f"асинхронно:      {concurrent:7.2f} с  {total_pages / concurrent:7.1f} стр/с  "
+              f"ускорение {sequential / concurrent:.2f}x")
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import os
+import sys
+import argparse
+import gc
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_to_docx import PageBlocks
+from synthetic import make_recognized_pages
+def retained_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    pages = build()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return current, pages
+def main():
+    parser = argparse.ArgumentParser(description="Память под распознанные блоки: словари против PageBlocks")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--lines-per-page", type=int, default=1000)
+    args = parser.parse_args()
+    blocks = args.pages * (args.lines_per_page + 1)
+    dict_bytes, _ = retained_bytes(
+        lambda: [page['text_blocks'] for page in make_recognized_pages(args.pages, args.lines_per_page)]
+    )
+    columnar_bytes, _ = retained_bytes(
+        lambda: [PageBlocks.from_blocks(page['text_blocks'])
+                 for page in make_recognized_pages(args.pages, args.lines_per_page)]
+    )
+    print(f"блоков {blocks}")
+    print(f"словари:    {dict_bytes / 1024 / 1024:8.1f} МБ  {dict_bytes / blocks:6.0f} байт/блок")
+    print(f"PageBlocks: {columnar_bytes / 1024 / 1024:8.1f} МБ  {columnar_bytes / blocks:6.0f} байт/блок  "
+          f"экономия {dict_bytes / columnar_bytes:.1f}x")
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import os
+import sys
+import argparse
+import tempfile
+import time
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_to_docx import DocxBuilder, StreamingDocxBuilder
+from synthetic import make_recognized_pages
+WRITERS = {
+    'python-docx': lambda output_path: DocxBuilder(),
+    'stream': lambda output_path: StreamingDocxBuilder(output_path)
+}
+def write(writer, output_path, pages, lines_per_page):
+    builder = WRITERS[writer](output_path)
+    try:
+        for page_data in make_recognized_pages(pages, lines_per_page):
+            builder.add_page(page_data)
+        builder.save(output_path)
+    finally:
+        builder.close()
+def main():
+    parser = argparse.ArgumentParser(description="Запись DOCX: python-docx против потоковой записи WordprocessingML")
+    parser.add_argument("--pages", type=int, default=10000)
+    parser.add_argument("--lines-per-page", type=int, default=40)
+    parser.add_argument("--writers", default="stream,python-docx")
+    parser.add_argument("--memory", action="store_true", help="дополнительный прогон с tracemalloc (память lxml не учитывается)")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for writer in args.writers.split(','):
+            output_path = os.path.join(tmp_dir, f"{writer}.docx")
+            started = time.perf_counter()
+            write(writer, output_path, args.pages, args.lines_per_page)
+            elapsed = time.perf_counter() - started
+            line = (f"{writer:<12} {elapsed:8.2f} с  {args.pages / elapsed:8.1f} стр/с  "
+                    f"файл {os.path.getsize(output_path) / 1024 / 1024:6.1f} МБ")
+            if args.memory:
+                tracemalloc.start()
+                write(writer, output_path, args.pages, args.lines_per_page)
+                line += f"  пик Python {tracemalloc.get_traced_memory()[1] / 1024 / 1024:7.1f} МБ"
+                tracemalloc.stop()
+            print(line)
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import os
+import sys
+import argparse
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fitz
+from pdf_to_docx import OCR_ENGINES, OCRProcessor, convert, manifest_path_for
+from bench_async_jobs import DelayedOCRProcessor
+from synthetic import build_born_digital_document, make_scanned_pdf, scan_document
+def edit_pages(pdf_path, pages, seed):
+    replacement = scan_document(build_born_digital_document(len(pages), seed=seed), seed=seed)
+    pdf_document = fitz.open(pdf_path)
+    for source_idx, page_idx in enumerate(pages):
+        pdf_document.delete_page(page_idx)
+        pdf_document.insert_pdf(replacement, from_page=source_idx, to_page=source_idx, start_at=page_idx)
+    pdf_document.save(pdf_path + ".edited")
+    pdf_document.close()
+    replacement.close()
+    os.replace(pdf_path + ".edited", pdf_path)
+def main():
+    parser = argparse.ArgumentParser(description="Повторная конвертация измененного PDF: целиком против манифеста страниц")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--edited", type=int, default=2, help="число измененных страниц")
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--engine", choices=OCR_ENGINES, default=None,
+                        help="настоящий OCR движок (по умолчанию заглушка с задержкой --ocr-delay)")
+    parser.add_argument("--ocr-delay", type=float, default=0.05, help="задержка заглушки OCR на страницу, с")
+    args = parser.parse_args()
+    DelayedOCRProcessor.delay = args.ocr_delay
+    processor = OCRProcessor() if args.engine else DelayedOCRProcessor()
+    engine = args.engine or "PaddleOCR"
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = make_scanned_pdf(os.path.join(tmp_dir, "scanned.pdf"), args.pages)
+        output_path = os.path.join(tmp_dir, "out.docx")
+        def run(manifest):
+            started = time.perf_counter()
+            convert(pdf_path, output_path, engine=engine, ocr_processor=processor, text_layer=False, dpi=args.dpi,
+                    manifest_path=manifest_path_for(output_path) if manifest else None)
+            return time.perf_counter() - started
+        first = run(True)
+        print(f"первая конвертация с манифестом: {first:7.2f} с")
+        step = max(1, args.pages // max(1, args.edited))
+        edit_pages(pdf_path, list(range(0, args.pages, step))[:args.edited], seed=args.pages)
+        full = run(False)
+        incremental = run(True)
+        print(f"повторно целиком:               {full:7.2f} с")
+        print(f"повторно по манифесту:          {incremental:7.2f} с  "
+              f"({args.edited} из {args.pages} страниц заново, ускорение {full / incremental:.1f}x)")
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+import os
+import sys
+import argparse
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_to_docx import layout_page_elements, paragraph_style
+from synthetic import make_paragraph_blocks, make_two_column_blocks
+def reading_order_ok(elements):
+    tokens = [word[0] for _, block in elements for word in block['text'].split()
+              if word[:1] in ('L', 'R') and word[1:].isdigit()]
+    return 'L' in tokens and 'R' in tokens and tokens == sorted(tokens)
+def main():
+    parser = argparse.ArgumentParser(description="Порядок чтения двухколоночной страницы при разной ширине промежутка")
+    parser.add_argument("--gutters", default="40,60,75,90,120", help="промежутки между колонками, пикс. при 300 DPI")
+    parser.add_argument("--lines", type=int, default=30, help="строк в колонке")
+    parser.add_argument("--line-height", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    failures = 0
+    for gutter in (int(value) for value in args.gutters.split(',')):
+        text_blocks = make_two_column_blocks(args.lines, gutter, line_height=args.line_height)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            elements = layout_page_elements(text_blocks)
+        elapsed = (time.perf_counter() - started) / args.repeat
+        ok = reading_order_ok(elements)
+        failures += not ok
+        print(f"промежуток {gutter:4d} пикс.: элементов {len(elements):3d}  {elapsed * 1000:6.2f} мс/стр  "
+              f"{'порядок верный' if ok else 'КОЛОНКИ ПЕРЕМЕШАНЫ'}")
+    paragraphs = 4
+    styles = [paragraph_style(block) for _, block in layout_page_elements(make_paragraph_blocks(paragraphs))]
+    ok = styles == ['Heading 1'] + ['Normal'] * paragraphs
+    failures += not ok
+    print(f"абзацы OCR: {len(styles) - 1} из {paragraphs}, заголовков {styles.count('Heading 1')}  "
+          f"{'разметка верная' if ok else 'КОРОТКИЕ СТРОКИ ОТДЕЛЕНЫ'}")
+    return 1 if failures else 0
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import os
+import sys
+import argparse
+import difflib
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_to_docx import OCRProcessor, render_pdf_page
+from synthetic import build_receipt_document, scan_document
+def normalize(text):
+    return ' '.join(text.split())
+def run(processor, process_func, images, truths, page_batch):
+    started = time.perf_counter()
+    recognized = []
+    for start in range(0, len(images), page_batch):
+        batch = images[start:start + page_batch]
+        if page_batch > 1:
+            recognized.extend(processor.recognize_page_batch(process_func, batch))
+        else:
+            recognized.append(processor.recognize_page(process_func, batch[0]))
+    elapsed = time.perf_counter() - started
+    accuracy = []
+    for page_data, truth in zip(recognized, truths):
+        blocks = sorted(page_data['text_blocks'], key=lambda block: block['coordinates'][0][1])
+        accuracy.append(difflib.SequenceMatcher(None, truth, normalize(' '.join(b['text'] for b in blocks))).ratio())
+    return elapsed, sum(accuracy) / len(accuracy)
+def main():
+    parser = argparse.ArgumentParser(description="PaddleOCR: распознавание строк по страницам против общих пакетов строк")
+    parser.add_argument("--pages", type=int, default=32, help="число коротких страниц (чеков)")
+    parser.add_argument("--dpi", type=int, default=200)
+    parser.add_argument("--page-batches", default="1,4,16")
+    parser.add_argument("--batch-size", type=int, default=32, help="строк в одном пакете распознавания")
+    parser.add_argument("--cpu-threads", type=int, default=None)
+    args = parser.parse_args()
+    source = build_receipt_document(args.pages)
+    scanned = scan_document(source, dpi=args.dpi, skew_degrees=0)
+    images = [render_pdf_page(page, args.dpi) for page in scanned]
+    truths = [normalize(page.get_text()) for page in source]
+    processor = OCRProcessor(cpu_threads=args.cpu_threads, paddle_batch_size=args.batch_size)
+    process_func = processor.get_process_func("PaddleOCR")
+    if not processor.supports_pooled_recognition(process_func):
+        print("Установленная версия PaddleOCR не предоставляет text_detector/text_recognizer, "
+              "общие пакеты строк недоступны")
+    baseline = None
+    for page_batch in (int(value) for value in args.page_batches.split(',')):
+        elapsed, accuracy = run(processor, process_func, images, truths, page_batch)
+        baseline = baseline or elapsed
+        print(f"страниц в пакете {page_batch:3d}: {elapsed:7.2f} с  {len(images) / elapsed:6.2f} стр/с  "
+              f"ускорение {baseline / elapsed:5.2f}x  точность {accuracy * 100:6.2f}%")
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import os
+import sys
+import argparse
+import difflib
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fitz
+from pdf_to_docx import OCR_ENGINES, OCRProcessor, preprocess_page, render_pdf_page
+from synthetic import build_born_digital_document, scan_document
+def normalize(text):
+    return ' '.join(text.split())
+def make_corpus(pages, dpi, skews):
+    source = build_born_digital_document(pages)
+    images = []
+    for page_idx in range(pages):
+        skew = skews[page_idx % len(skews)]
+        page = fitz.open()
+        page.insert_pdf(source, from_page=page_idx, to_page=page_idx)
+        scanned = scan_document(page, dpi=dpi, skew_degrees=skew, seed=page_idx)
+        images.append((skew, render_pdf_page(scanned[0], dpi)))
+        scanned.close()
+        page.close()
+    truths = [normalize(page.get_text()) for page in source]
+    source.close()
+    return images, truths
+def run_ocr(processor, process_func, images, truths):
+    started = time.perf_counter()
+    accuracy = []
+    for (_, image), truth in zip(images, truths):
+        page_data = processor.recognize_page(process_func, image)
+        blocks = sorted(page_data['text_blocks'], key=lambda block: block['coordinates'][0][1])
+        text = normalize(' '.join(block['text'] for block in blocks))
+        accuracy.append(difflib.SequenceMatcher(None, truth, text).ratio())
+    return time.perf_counter() - started, sum(accuracy) / len(accuracy)
+def main():
+    parser = argparse.ArgumentParser(description="Предобработка страниц перед OCR: наклон, поля, пиксели, время и точность")
+    parser.add_argument("--engine", choices=OCR_ENGINES, default="PaddleOCR")
+    parser.add_argument("--pages", type=int, default=6)
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--skews", default="0,0.5,-1.5,3", help="наклоны синтетических сканов в градусах")
+    parser.add_argument("--binarize", action="store_true")
+    parser.add_argument("--max-side", type=int, default=None)
+    parser.add_argument("--no-ocr", action="store_true", help="только предобработка, без OCR")
+    args = parser.parse_args()
+    skews = [float(value) for value in args.skews.split(',')]
+    images, truths = make_corpus(args.pages, args.dpi, skews)
+    options = {'binarize': args.binarize, 'max_side': args.max_side}
+    pixels_before = pixels_after = 0
+    elapsed = 0.0
+    upright = 0
+    for skew, image in images:
+        started = time.perf_counter()
+        processed, transform = preprocess_page(image, **options)
+        elapsed += time.perf_counter() - started
+        pixels_before += image.shape[0] * image.shape[1]
+        pixels_after += processed.shape[0] * processed.shape[1]
+        upright += transform['upright']
+        print(f"наклон {skew:+5.2f}°: оценка {-transform['angle']:+5.2f}°  "
+              f"{image.shape[1]}x{image.shape[0]} -> {processed.shape[1]}x{processed.shape[0]}")
+    print(f"предобработка: {elapsed / len(images) * 1000:.1f} мс/стр, пикселей {pixels_before / 1e6:.1f} -> "
+          f"{pixels_after / 1e6:.1f} Мпикс ({pixels_after / pixels_before * 100:.0f}%), "
+          f"без классификатора углов {upright}/{len(images)} стр.")
+    if args.no_ocr:
+        return 0
+    results = {}
+    for mode, preprocess in (('без предобработки', None), ('с предобработкой', options)):
+        processor = OCRProcessor(preprocess=preprocess)
+        try:
+            process_func = processor.get_process_func(args.engine)
+        except Exception as e:
+            print(f"OCR пропущен: {e}")
+            return 0
+        results[mode] = run_ocr(processor, process_func, images, truths)
+        print(f"{mode:<18}: {results[mode][0]:7.2f} с  точность {results[mode][1] * 100:6.2f}%")
+    plain, preprocessed = results['без предобработки'], results['с предобработкой']
+    print(f"ускорение {plain[0] / preprocessed[0]:.2f}x, изменение точности {(preprocessed[1] - plain[1]) * 100:+.2f} п.п.")
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
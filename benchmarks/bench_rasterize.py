@@ -0,0 +1,50 @@
+import os
+import sys
+import argparse
+import tempfile
+import time
+import importlib.util
+import numpy as np
+from PIL import Image
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_to_docx import convert_pdf_to_images, render_pdf_pages
+from synthetic import make_born_digital_pdf
+def bench_pdf2image(pdf_path, dpi):
+    started = time.perf_counter()
+    image_paths = convert_pdf_to_images(pdf_path, dpi=dpi)
+    pixels = 0
+    for image_path in image_paths:
+        pixels += np.asarray(Image.open(image_path).convert("RGB")).size
+    elapsed = time.perf_counter() - started
+    for image_path in image_paths:
+        os.unlink(image_path)
+    return elapsed, len(image_paths), pixels
+def bench_fitz(pdf_path, dpi):
+    started = time.perf_counter()
+    pages = 0
+    pixels = 0
+    for _, image in render_pdf_pages(pdf_path, dpi=dpi):
+        pages += 1
+        pixels += image.size
+    return time.perf_counter() - started, pages, pixels
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение растеризации: pdf2image+PNG против fitz в памяти")
+    parser.add_argument("pdf", nargs="?", help="PDF для замера (по умолчанию синтетический)")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--dpi", type=int, default=300)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = os.path.join(tmp_dir, "sample.pdf")
+            make_born_digital_pdf(pdf_path, args.pages)
+        results = {"fitz (в памяти)": bench_fitz(pdf_path, args.dpi)}
+        if importlib.util.find_spec("pdf2image") is not None:
+            results["pdf2image (PNG)"] = bench_pdf2image(pdf_path, args.dpi)
+        else:
+            print("pdf2image не установлен, замер пути через PNG пропущен")
+    for name, (elapsed, pages, pixels) in results.items():
+        print(f"{name:<18} {elapsed:7.2f} с  {pages / elapsed:6.2f} стр/с  {pixels / elapsed / 1e6:8.1f} Мбайт/с")
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+import time
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("PyQt6", "torch", "transformers", "paddleocr", "paddle", "pdf2image")
+def measure(command, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT_DIR, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - started)
+    return timings
+def heavy_modules_loaded():
+    probe = ("import sys, pdf_to_docx; "
+             f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", probe], cwd=ROOT_DIR, check=True,
+                            capture_output=True, text=True)
+    last_line = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+    return [m for m in last_line.split(',') if m in HEAVY_MODULES]
+def main():
+    parser = argparse.ArgumentParser(description="Замер холодного старта pdf_to_docx без GUI")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0, help="допустимое медианное время, с")
+    args = parser.parse_args()
+    cases = {
+        "python (пустой)": [sys.executable, "-c", "pass"],
+        "import pdf_to_docx": [sys.executable, "-c", "import pdf_to_docx"],
+        "pdf_to_docx --help": [sys.executable, "pdf_to_docx.py", "--help"],
+    }
+    medians = {}
+    for name, command in cases.items():
+        timings = measure(command, args.runs)
+        medians[name] = statistics.median(timings)
+        print(f"{name:<22} медиана {medians[name] * 1000:7.1f} мс  макс {max(timings) * 1000:7.1f} мс")
+    loaded = heavy_modules_loaded()
+    if loaded:
+        print(f"ОШИБКА: при импорте загружены тяжелые модули: {', '.join(loaded)}")
+        return 1
+    if medians["pdf_to_docx --help"] > args.budget:
+        print(f"ОШИБКА: холодный старт превышает бюджет {args.budget:.2f} с")
+        return 1
+    print(f"Холодный старт укладывается в бюджет {args.budget:.2f} с")
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
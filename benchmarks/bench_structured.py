@@ -0,0 +1,56 @@
+import os
+import sys
+import argparse
+import json
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_to_docx import STRUCTURED_FORMATS, OCRProcessor, convert
+from run_benchmarks import StubOCRProcessor
+from synthetic import make_born_digital_pdf, make_scanned_pdf
+def run(path, output, args, structured_format=None):
+    structured_output = None
+    if structured_format:
+        structured_output = os.path.splitext(output)[0] + f".{structured_format}"
+    first_page = []
+    started = time.perf_counter()
+    def report(value):
+        if not first_page and structured_output and os.path.exists(structured_output) \
+                and os.path.getsize(structured_output) > 1024:
+            first_page.append(time.perf_counter() - started)
+    processor = OCRProcessor() if args.real_ocr else StubOCRProcessor()
+    convert(path, output, ocr_processor=processor, dpi=args.dpi, streaming_docx=True, progress_callback=report,
+            structured_output=structured_output, structured_format=structured_format)
+    return time.perf_counter() - started, first_page[0] if first_page else None, structured_output
+def main():
+    parser = argparse.ArgumentParser(description="DOCX против DOCX + JSON Lines/hOCR за один проход")
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--scanned", action="store_true", help="сканированный документ вместо текстового слоя")
+    parser.add_argument("--real-ocr", action="store_true", help="настоящий движок OCR вместо заглушки")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as work_dir:
+        source = os.path.join(work_dir, "source.pdf")
+        if args.scanned:
+            make_scanned_pdf(source, args.pages)
+        else:
+            make_born_digital_pdf(source, args.pages, with_images=True)
+        output = os.path.join(work_dir, "out.docx")
+        baseline, _, _ = run(source, output, args)
+        print(f"только DOCX:    {baseline:7.2f} с")
+        for structured_format in STRUCTURED_FORMATS:
+            elapsed, first_page, structured_output = run(source, output, args, structured_format)
+            size = os.path.getsize(structured_output)
+            line = f"DOCX + {structured_format:<6}: {elapsed:7.2f} с  накладные {(elapsed / baseline - 1) * 100:+5.1f}%  " \
+                   f"файл {size / 1024:7.1f} КБ"
+            if first_page is not None:
+                line += f"  первые данные через {first_page:.2f} с"
+            print(line)
+            if structured_format == 'jsonl':
+                with open(structured_output, encoding='utf-8') as structured_file:
+                    pages = [json.loads(line) for line in structured_file]
+                elements = sum(len(page['elements']) for page in pages)
+                print(f"  страниц {len(pages)}, элементов {elements}")
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
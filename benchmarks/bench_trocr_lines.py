@@ -0,0 +1,40 @@
+import os
+import sys
+import argparse
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PIL import Image
+from pdf_to_docx import OCRProcessor, load_rgb_image, render_pdf_page, segment_text_lines
+from synthetic import build_born_digital_document
+def make_page_image(font_size, dpi=150):
+    pdf_document = build_born_digital_document(1, font_size=font_size)
+    image = render_pdf_page(pdf_document[0], dpi)
+    pdf_document.close()
+    return Image.fromarray(image)
+def main():
+    parser = argparse.ArgumentParser(description="Пропускная способность TrOCR: страница целиком против пакетов строк")
+    parser.add_argument("image", nargs="?", help="изображение страницы (по умолчанию синтетическое)")
+    parser.add_argument("--font-size", type=float, default=14, help="размер шрифта синтетической страницы")
+    parser.add_argument("--batch-sizes", default="1,4,8,16,32")
+    parser.add_argument("--cpu-threads", type=int, default=None)
+    args = parser.parse_args()
+    image = load_rgb_image(args.image) if args.image else make_page_image(args.font_size)
+    started = time.perf_counter()
+    boxes = segment_text_lines(image)
+    print(f"сегментация: {len(boxes)} строк за {(time.perf_counter() - started) * 1000:.1f} мс")
+    processor = OCRProcessor(cpu_threads=args.cpu_threads, trocr_lines=False)
+    processor.init_trocr()
+    started = time.perf_counter()
+    processor._process_with_trocr(image)
+    print(f"страница целиком:  {time.perf_counter() - started:7.2f} с (один блок текста)")
+    processor.trocr_lines = True
+    for batch_size in (int(value) for value in args.batch_sizes.split(',')):
+        processor.trocr_batch_size = batch_size
+        processor.trocr_stats = {'lines': 0, 'seconds': 0.0}
+        processor._process_with_trocr(image)
+        stats = processor.trocr_stats
+        print(f"пакет {batch_size:3d} строк: {stats['seconds']:7.2f} с  "
+              f"{stats['lines'] / stats['seconds']:6.2f} строк/с")
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
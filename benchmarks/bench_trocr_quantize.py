@@ -0,0 +1,74 @@
+import os
+import sys
+import argparse
+import difflib
+import glob
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fitz
+import numpy as np
+from PIL import Image
+from pdf_to_docx import OCRProcessor, PipelineProfiler, render_pdf_page
+from synthetic import sample_line
+def make_samples(count, font_size=14, dpi=150, seed=0):
+    rng = np.random.default_rng(seed)
+    samples = []
+    for _ in range(count):
+        text = sample_line(rng, words=5)
+        document = fitz.open()
+        page = document.new_page(width=font_size * len(text) * 0.6 + 20, height=font_size * 2)
+        page.insert_text((10, font_size * 1.4), text, fontsize=font_size)
+        samples.append((Image.fromarray(render_pdf_page(page, dpi)), text))
+        document.close()
+    return samples
+def load_samples(directory):
+    samples = []
+    for image_path in sorted(glob.glob(os.path.join(directory, "*"))):
+        truth_path = os.path.splitext(image_path)[0] + ".txt"
+        if image_path.endswith(".txt") or not os.path.exists(truth_path):
+            continue
+        with open(truth_path, encoding='utf-8') as truth_file:
+            samples.append((Image.open(image_path).convert("RGB"), truth_file.read().strip()))
+    return samples
+def measure(quantize, samples, cpu_threads, batch_size, local_only):
+    processor = OCRProcessor(cpu_threads=cpu_threads, trocr_batch_size=batch_size, trocr_quantize=quantize,
+                             trocr_local_only=local_only)
+    started = time.perf_counter()
+    processor.init_trocr()
+    load_seconds = time.perf_counter() - started
+    images = [image for image, _ in samples]
+    processor.recognize_trocr_lines(images[:1])
+    started = time.perf_counter()
+    texts = processor.recognize_trocr_lines(images)
+    seconds = time.perf_counter() - started
+    accuracy = [difflib.SequenceMatcher(None, truth.lower(), text.lower()).ratio()
+                for (_, truth), text in zip(samples, texts)]
+    return load_seconds, seconds / len(samples), PipelineProfiler.peak_rss_bytes()[0], sum(accuracy) / len(accuracy)
+def main():
+    parser = argparse.ArgumentParser(description="TrOCR на CPU: fp32 против динамического квантования int8")
+    parser.add_argument("--samples", help="каталог с изображениями строк и одноименными .txt (по умолчанию синтетика)")
+    parser.add_argument("--lines", type=int, default=32, help="число синтетических строк")
+    parser.add_argument("--cpu-threads", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--local-only", action="store_true", help="не обращаться к сети при загрузке модели")
+    args = parser.parse_args()
+    samples = load_samples(args.samples) if args.samples else make_samples(args.lines)
+    if not samples:
+        print("Нет образцов: нужны изображения с одноименными .txt")
+        return 1
+    results = {}
+    for name, quantize in (('fp32', False), ('int8', True)):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results[name] = executor.submit(measure, quantize, samples, args.cpu_threads, args.batch_size,
+                                            args.local_only).result()
+        load_seconds, latency, rss, accuracy = results[name]
+        rss_text = f"{rss / 1024 / 1024:7.1f} МБ" if rss else "н/д"
+        print(f"{name}: загрузка {load_seconds:6.2f} с  {latency * 1000:8.1f} мс/строка  пик RSS {rss_text}  "
+              f"точность {accuracy * 100:6.2f}%")
+    fp32, int8 = results['fp32'], results['int8']
+    print(f"ускорение {fp32[1] / int8[1]:.2f}x, изменение точности {(int8[3] - fp32[3]) * 100:+.2f} п.п.")
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import os
+import sys
+import argparse
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fitz
+from pdf_to_docx import OCR_ENGINES, convert
+from synthetic import make_scanned_pdf
+def main():
+    parser = argparse.ArgumentParser(description="Масштабирование OCR по числу процессов")
+    parser.add_argument("pdf", nargs="?", help="сканированный PDF (по умолчанию синтетический)")
+    parser.add_argument("--pages", type=int, default=16)
+    parser.add_argument("--engine", choices=OCR_ENGINES, default="PaddleOCR")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--cpu-threads", type=int, default=1,
+                        help="потоков вычислений на процесс (по умолчанию 1, чтобы не было переподписки)")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = os.path.join(tmp_dir, "scanned.pdf")
+            make_scanned_pdf(pdf_path, args.pages)
+        with fitz.open(pdf_path) as pdf_document:
+            pages = pdf_document.page_count
+        output_path = os.path.join(tmp_dir, "out.docx")
+        baseline = None
+        workers = 1
+        while workers <= args.max_workers:
+            started = time.perf_counter()
+            convert(pdf_path, output_path, engine=args.engine, text_layer=False,
+                    workers=workers, cpu_threads=args.cpu_threads)
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(f"процессов {workers:3d}: {elapsed:7.2f} с  {pages / elapsed:6.2f} стр/с  "
+                  f"ускорение {baseline / elapsed:5.2f}x (включая загрузку моделей)")
+            workers *= 2
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
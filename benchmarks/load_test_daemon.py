@@ -0,0 +1,74 @@
+import os
+import sys
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from synthetic import make_scanned_pdf
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+def send(url, data):
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/pdf"})
+    started = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        response.read()
+    return time.perf_counter() - started
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест сервиса конвертации (python pdf_to_docx.py --serve)")
+    parser.add_argument("pdf", nargs="?", help="PDF для отправки (по умолчанию синтетический скан)")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--engine", default="PaddleOCR")
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    if args.pdf:
+        with open(args.pdf, 'rb') as pdf_file:
+            data = pdf_file.read()
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pdf_path = os.path.join(tmp_dir, "scanned.pdf")
+            make_scanned_pdf(pdf_path, args.pages)
+            with open(pdf_path, 'rb') as pdf_file:
+                data = pdf_file.read()
+    url = f"{args.url}/convert?engine={args.engine}&filename=load_test.pdf"
+    latencies = []
+    errors = []
+    remaining = iter(range(args.requests))
+    lock = threading.Lock()
+    def client():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            try:
+                latency = send(url, data)
+                with lock:
+                    latencies.append(latency)
+            except (urllib.error.URLError, OSError) as e:
+                with lock:
+                    errors.append(str(e))
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if not latencies:
+        print(f"Все запросы завершились ошибкой: {errors[:1]}")
+        return 1
+    print(f"запросов {len(latencies)}, ошибок {len(errors)}, параллельно {args.concurrency}")
+    print(f"p50 {statistics.median(latencies) * 1000:8.1f} мс")
+    print(f"p99 {percentile(latencies, 0.99) * 1000:8.1f} мс")
+    print(f"макс {max(latencies) * 1000:7.1f} мс")
+    print(f"пропускная способность {len(latencies) / elapsed:.2f} док/с")
+    return 0 if not errors else 1
+if __name__ == "__main__":
+    sys.exit(main())
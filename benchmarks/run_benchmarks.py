@@ -0,0 +1,134 @@
+import os
+import sys
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from pdf_to_docx import (OCRProcessor, StreamingDocxBuilder, convert, convert_pdf_to_images,
+                         extract_images_from_pdf, extract_text_from_pdf, render_pdf_pages, save_docx_file,
+                         segment_text_lines)
+from synthetic import make_born_digital_pdf, make_scanned_pdf
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+class StubOCRProcessor(OCRProcessor):
+    def get_process_func(self, ocr_engine="PaddleOCR"):
+        return self._process_with_stub
+    def _process_with_stub(self, image):
+        page_data = {
+            'text_blocks': []
+        }
+        for i, (x0, y0, x1, y1) in enumerate(segment_text_lines(image)):
+            page_data['text_blocks'].append({
+                'text': f"stub line {i}",
+                'confidence': 0.9,
+                'coordinates': [[x0, y0], [x1, y0], [x1, y1], [x0, y1]],
+                'type': 'text'
+            })
+        return page_data
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    func()
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(timings), peak_bytes
+def build_cases(work_dir, pages, stub_dpi):
+    born_pdf = make_born_digital_pdf(os.path.join(work_dir, f"born_{pages}.pdf"), pages, with_images=True)
+    scanned_pdf = make_scanned_pdf(os.path.join(work_dir, f"scanned_{pages}.pdf"), pages)
+    stub_images = [image for _, image in render_pdf_pages(scanned_pdf, dpi=stub_dpi)]
+    recognized = StubOCRProcessor().process_images(stub_images)
+    output_path = os.path.join(work_dir, "out.docx")
+    def run_streaming_docx():
+        builder = StreamingDocxBuilder(output_path)
+        for page_data in recognized:
+            builder.add_page(page_data)
+        builder.save()
+    def run_pdf2image():
+        for image_path in convert_pdf_to_images(scanned_pdf, dpi=stub_dpi):
+            os.unlink(image_path)
+    cases = {
+        'render_pdf_pages': lambda: sum(1 for _ in render_pdf_pages(scanned_pdf, dpi=stub_dpi)),
+        'extract_text_from_pdf': lambda: extract_text_from_pdf(born_pdf),
+        'extract_images_from_pdf': lambda: extract_images_from_pdf(born_pdf, in_memory=True),
+        'process_images[stub]': lambda: StubOCRProcessor().process_images(stub_images),
+        'save_docx_file': lambda: save_docx_file(recognized, output_path),
+        'save_docx_file[stream]': run_streaming_docx,
+        'convert[text_layer]': lambda: convert(born_pdf, output_path),
+        'convert[stub_ocr]': lambda: convert(scanned_pdf, output_path, ocr_processor=StubOCRProcessor(),
+                                             text_layer=False, dpi=stub_dpi, embed_images=False),
+    }
+    if importlib.util.find_spec("pdf2image") is not None:
+        cases['convert_pdf_to_images'] = run_pdf2image
+    return cases
+def run(page_counts, repeat, stub_dpi):
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for pages in page_counts:
+            for name, func in build_cases(work_dir, pages, stub_dpi).items():
+                seconds, peak_bytes = measure(func, repeat)
+                key = f"{name}@{pages}"
+                results[key] = {
+                    'seconds': seconds,
+                    'pages_per_second': pages / seconds if seconds else 0.0,
+                    'peak_bytes': peak_bytes
+                }
+                print(f"{key:<34} {seconds * 1000:9.1f} мс  {results[key]['pages_per_second']:8.1f} стр/с  "
+                      f"пик {peak_bytes / 1024 / 1024:7.1f} МБ")
+    return results
+def compare(results, baseline, tolerance):
+    regressions = []
+    print(f"\nСравнение с эталоном (допуск {tolerance * 100:.0f}%):")
+    for key, result in results.items():
+        reference = baseline.get('results', {}).get(key)
+        if not reference or not reference['seconds']:
+            continue
+        ratio = result['seconds'] / reference['seconds']
+        marker = "РЕГРЕССИЯ" if ratio > 1 + tolerance else ""
+        print(f"{key:<34} {ratio:6.2f}x {marker}")
+        if marker:
+            regressions.append(key)
+    return regressions
+def main():
+    parser = argparse.ArgumentParser(description="Набор замеров конвейера на синтетических PDF (без сети)")
+    parser.add_argument("--pages", default="1,5,20", help="число страниц через запятую")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--stub-dpi", type=int, default=100, help="DPI растеризации для замеров с заглушкой OCR")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="сохранить результаты как новый эталон")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="допустимое замедление относительно эталона")
+    parser.add_argument("--json", help="записать результаты в JSON")
+    args = parser.parse_args()
+    page_counts = [int(value) for value in args.pages.split(',')]
+    results = run(page_counts, args.repeat, args.stub_dpi)
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'pages': page_counts,
+        'stub_dpi': args.stub_dpi,
+        'results': results
+    }
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as baseline_file:
+            json.dump(report, baseline_file, ensure_ascii=False, indent=2)
+        print(f"Эталон сохранен в {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("Эталон не найден, сравнение пропущено (используйте --save-baseline)")
+        return 0
+    with open(args.baseline, encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)
+    return 1 if compare(results, baseline, args.tolerance) else 0
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+import io
+import numpy as np
+import fitz
+from PIL import Image
+WORDS = ("document", "invoice", "total", "amount", "quick", "brown", "fox", "jumps", "over", "lazy",
+         "dog", "report", "section", "table", "value", "number", "payment", "customer", "order", "date")
+def sample_line(rng, words=8):
+    return ' '.join(rng.choice(WORDS, size=words))
+def make_logo_png(width=160, height=60, seed=0):
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+def build_born_digital_document(pages, font_size=11, seed=0, with_images=False):
+    rng = np.random.default_rng(seed)
+    logo = make_logo_png(seed=seed) if with_images else None
+    document = fitz.open()
+    for page_idx in range(pages):
+        page = document.new_page()
+        page.insert_text((72, 72), f"SECTION {page_idx + 1}", fontsize=font_size * 1.6)
+        if logo:
+            page.insert_image(fitz.Rect(400, 40, 520, 85), stream=logo)
+        y = 72 + font_size * 3
+        while y < page.rect.height - 72:
+            page.insert_text((72, y), sample_line(rng), fontsize=font_size)
+            y += font_size * 1.5
+    return document
+def build_receipt_document(pages, lines=8, font_size=9, seed=0):
+    rng = np.random.default_rng(seed)
+    document = fitz.open()
+    for page_idx in range(pages):
+        page = document.new_page(width=220, height=40 + lines * font_size * 1.6)
+        page.insert_text((16, 24), f"ORDER {page_idx + 1}", fontsize=font_size * 1.4)
+        for line_idx in range(lines):
+            y = 24 + (line_idx + 1.5) * font_size * 1.6
+            page.insert_text((16, y), f"{sample_line(rng, words=2)} {rng.integers(1, 999)}.00", fontsize=font_size)
+    return document
+def scan_document(document, dpi=150, skew_degrees=0.3, noise=8, seed=0):
+    rng = np.random.default_rng(seed)
+    scanned = fitz.open()
+    for page in document:
+        pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        pixels = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.stride)[:, :pixmap.width]
+        if noise:
+            pixels = np.clip(pixels.astype(np.int16) + rng.integers(-noise, noise + 1, size=pixels.shape), 0, 255)
+        image = Image.fromarray(pixels.astype(np.uint8))
+        if skew_degrees:
+            image = image.rotate(skew_degrees, resample=Image.Resampling.BILINEAR, fillcolor=255)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        scanned_page = scanned.new_page(width=page.rect.width, height=page.rect.height)
+        scanned_page.insert_image(scanned_page.rect, stream=buffer.getvalue())
+    return scanned
+def make_born_digital_pdf(path, pages, **options):
+    document = build_born_digital_document(pages, **options)
+    document.save(path)
+    document.close()
+    return path
+def make_scanned_pdf(path, pages, dpi=150, font_size=11, seed=0, **scan_options):
+    source = build_born_digital_document(pages, font_size=font_size, seed=seed)
+    scanned = scan_document(source, dpi=dpi, seed=seed, **scan_options)
+    scanned.save(path)
+    scanned.close()
+    source.close()
+    return path
+def make_recognized_pages(pages, lines_per_page=40, dpi=300, seed=0):
+    rng = np.random.default_rng(seed)
+    line_height = dpi // 6
+    for page_idx in range(pages):
+        text_blocks = [{
+            'text': f"SECTION {page_idx + 1}",
+            'confidence': 1.0,
+            'coordinates': [[dpi, dpi], [dpi * 4, dpi], [dpi * 4, dpi + line_height], [dpi, dpi + line_height]],
+            'type': 'header'
+        }]
+        for line_idx in range(lines_per_page):
+            y0 = dpi + (line_idx + 2) * line_height
+            text = sample_line(rng)
+            if line_idx % 10 == 9:
+                text = f"- {text}"
+            x1 = dpi * (4 if line_idx % 5 == 4 else 7)
+            text_blocks.append({
+                'text': text,
+                'confidence': 0.9,
+                'coordinates': [[dpi, y0], [x1, y0], [x1, y0 + line_height * 0.8], [dpi, y0 + line_height * 0.8]],
+                'type': 'text'
+            })
+        yield {'image_path': f"synthetic#page={page_idx + 1}", 'dpi': dpi, 'text_blocks': text_blocks}
+def make_two_column_blocks(lines=30, gutter=75, dpi=300, line_height=40, seed=0):
+    rng = np.random.default_rng(seed)
+    left = dpi
+    width = (dpi * 65 // 10 - gutter) // 2
+    text_blocks = [{
+        'text': "TWO COLUMN REPORT",
+        'confidence': 1.0,
+        'coordinates': [[left, dpi], [left + 2 * width + gutter, dpi], [left + 2 * width + gutter, dpi + line_height],
+                        [left, dpi + line_height]],
+        'type': 'header'
+    }]
+    for column, prefix in enumerate("LR"):
+        x0 = left + column * (width + gutter)
+        for line_idx in range(lines):
+            y0 = dpi + (line_idx + 2) * line_height * 1.25
+            x1 = x0 + width - int(rng.integers(0, line_height // 2))
+            text_blocks.append({
+                'text': f"{prefix}{line_idx} {sample_line(rng, words=5)}",
+                'confidence': 0.9,
+                'coordinates': [[x0, y0], [x1, y0], [x1, y0 + line_height], [x0, y0 + line_height]],
+                'type': 'text'
+            })
+    return text_blocks
+def make_paragraph_blocks(paragraphs=4, lines=3, dpi=300, line_height=40, seed=0):
+    rng = np.random.default_rng(seed)
+    text_blocks = [{
+        'text': "QUARTERLY SUMMARY",
+        'confidence': 0.95,
+        'coordinates': [[dpi, dpi], [dpi * 3, dpi], [dpi * 3, dpi + line_height * 1.5], [dpi, dpi + line_height * 1.5]],
+        'type': 'header'
+    }]
+    y0 = dpi + line_height * 2.5
+    for _ in range(paragraphs):
+        for line_idx in range(lines):
+            last = line_idx == lines - 1
+            text = sample_line(rng, words=2 if last else 9)
+            x1 = dpi * (3 if last else 7)
+            text_blocks.append({
+                'text': f"{text}." if last else text,
+                'confidence': 0.95,
+                'coordinates': [[dpi, y0], [x1, y0], [x1, y0 + line_height], [dpi, y0 + line_height]],
+                'type': 'header' if last else 'text'
+            })
+            y0 += line_height * 1.3
+        y0 += line_height
+    return text_blocks
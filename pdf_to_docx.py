@@ -1,40 +1,60 @@
 import os
 import sys
+import argparse
+import asyncio
+import collections
+import contextlib
+import functools
+import hashlib
+import importlib.util
+import io
+import json
+import multiprocessing
+import queue
+import sqlite3
 import tempfile
+import threading
 import re
+import shutil
+import time
 import uuid
+import zipfile
 from PIL import Image
-from PIL.ImageQt import ImageQt
 import numpy as np
-import torch
+try:
+    import resource
+except ImportError:
+    resource = None
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
 import fitz  
-from pdf2image import convert_from_path
 import docx
 from docx.shared import Inches, Pt
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton, 
-                           QFileDialog, QProgressBar, QLabel, QHBoxLayout,
-                           QMessageBox, QComboBox, QGroupBox, QGridLayout)
-from PyQt6.QtCore import Qt, QMimeData, QUrl, pyqtSignal, QThread
-from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QPixmap, QIcon
-try:
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape as xml_escape
+PADDLE_OCR_AVAILABLE = importlib.util.find_spec("paddleocr") is not None
+TROCR_AVAILABLE = (importlib.util.find_spec("transformers") is not None
+                   and importlib.util.find_spec("torch") is not None)
+OCR_ENGINES = ("PaddleOCR", "TrOCR")
+def import_paddle_ocr():
     from paddleocr import PaddleOCR
-    PADDLE_OCR_AVAILABLE = True
-except ImportError:
-    print("PaddleOCR не установлен. Будет доступен только TrOCR.")
-    PADDLE_OCR_AVAILABLE = False
-try:
+    return PaddleOCR
+def import_trocr():
+    import torch
     from transformers import TrOCRProcessor, VisionEncoderDecoderModel
-    TROCR_AVAILABLE = True
-except ImportError:
-    print("TrOCR не установлен. Будет доступен только PaddleOCR.")
-    TROCR_AVAILABLE = False
-if not PADDLE_OCR_AVAILABLE and not TROCR_AVAILABLE:
-    print("ОШИБКА: Ни один из OCR движков (PaddleOCR, TrOCR) не установлен.")
-    print("Установите хотя бы один из них:")
-    print("pip install paddleocr paddlepaddle")
-    print("pip install transformers")
-    sys.exit(1)
+    return torch, TrOCRProcessor, VisionEncoderDecoderModel
+def quantize_linear_layers(torch, model):
+    quantization = torch.ao.quantization if hasattr(torch, 'ao') else torch.quantization
+    return quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
 def get_file_extension(file_path):
     _, ext = os.path.splitext(file_path)
     return ext[1:] if ext else ""
@@ -65,23 +85,88 @@ def is_list_item(text):
     if re.match(r'^\d+\.?\s', text):
         return True
     return False
+TEMP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp")
+WORKSPACE_PREFIX = "job_"
+WORKSPACE_LOCK = ".lock"
+def default_temp_root():
+    return os.environ.get("PDF_TO_DOCX_TEMP") or TEMP_DIR
 def clean_temp_files():
-    temp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp")
+    temp_dir = TEMP_DIR
     if os.path.exists(temp_dir):
         for file_name in os.listdir(temp_dir):
             file_path = os.path.join(temp_dir, file_name)
             try:
                 if os.path.isfile(file_path):
                     os.unlink(file_path)
+                elif file_name.startswith(WORKSPACE_PREFIX) and not workspace_in_use(file_path):
+                    shutil.rmtree(file_path)
             except Exception as e:
                 print(f"Ошибка при удалении {file_path}: {e}")
+def try_lock(handle):
+    try:
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        elif msvcrt:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            return None
+        return True
+    except OSError:
+        return False
+def workspace_in_use(path, grace=3600):
+    lock_path = os.path.join(path, WORKSPACE_LOCK)
+    if os.path.exists(lock_path):
+        with open(lock_path, 'a+b') as handle:
+            locked = try_lock(handle)
+        if locked is not None:
+            return not locked
+    return time.time() - os.path.getmtime(path) < grace
+class WorkspaceLimitExceeded(Exception):
+    pass
+class Workspace:
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or default_temp_root()
+        os.makedirs(self.root, exist_ok=True)
+        self.path = tempfile.mkdtemp(prefix=WORKSPACE_PREFIX, dir=self.root)
+        self.lock_file = open(os.path.join(self.path, WORKSPACE_LOCK), 'a+b')
+        try_lock(self.lock_file)
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.lock = threading.Lock()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc_info):
+        self.close()
+    def reserve(self, nbytes):
+        with self.lock:
+            if self.max_bytes is not None and self.used_bytes + nbytes > self.max_bytes:
+                raise WorkspaceLimitExceeded(
+                    f"Временные файлы задания превысили лимит {self.max_bytes} байт"
+                )
+            self.used_bytes += nbytes
+    def account(self, paths):
+        self.reserve(sum(os.path.getsize(path) for path in paths))
+    def file_path(self, name):
+        return os.path.join(self.path, name)
+    def write(self, name, data):
+        self.reserve(len(data))
+        path = self.file_path(name)
+        with open(path, 'wb') as target:
+            target.write(data)
+        return path
+    def temporary_file(self):
+        return tempfile.TemporaryFile(dir=self.path)
+    def close(self):
+        self.lock_file.close()
+        shutil.rmtree(self.path, ignore_errors=True)
 def detect_language(text):
     if re.search(r'[а-яА-ЯёЁ]', text):
         return 'ru'
     return 'en'
-def convert_pdf_to_images(pdf_path, dpi=300, pages=None):
-    temp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp")
+def convert_pdf_to_images(pdf_path, dpi=300, pages=None, workspace=None):
+    temp_dir = workspace.path if workspace else TEMP_DIR
     os.makedirs(temp_dir, exist_ok=True)
+    from pdf2image import convert_from_path
     file_prefix = f"pdf_page_{uuid.uuid4().hex}_"
     images = convert_from_path(
         pdf_path, 
@@ -93,59 +178,626 @@ def convert_pdf_to_images(pdf_path, dpi=300, pages=None):
         first_page=pages[0] + 1 if pages else None,
         last_page=pages[-1] + 1 if pages else None
     )
+    if workspace:
+        workspace.account(images)
+    return images
+DOCX_IMAGE_FORMATS = ('png', 'jpg', 'jpeg', 'jpe', 'bmp', 'gif', 'tif', 'tiff')
+def page_image_placements(page):
+    placements = []
+    seen_xrefs = set()
+    for img_info in page.get_images(full=True):
+        xref = img_info[0]
+        if xref in seen_xrefs:
+            continue
+        seen_xrefs.add(xref)
+        for rect in page.get_image_rects(xref):
+            if rect.is_empty or rect.is_infinite:
+                continue
+            placements.append((xref, [rect.x0, rect.y0, rect.x1, rect.y1]))
+    return placements
+def extract_page_images(pdf_document, page, image_cache, max_coverage=None, cache_size=64):
+    page_area = page.rect.width * page.rect.height
+    images = []
+    for xref, rect in page_image_placements(page):
+        if max_coverage is not None and (rect[2] - rect[0]) * (rect[3] - rect[1]) >= max_coverage * page_area:
+            continue
+        base_image = image_cache.get(xref)
+        if base_image is None:
+            try:
+                base_image = pdf_document.extract_image(xref)
+            except Exception as e:
+                print(f"Ошибка при извлечении изображения {xref}: {str(e)}")
+                continue
+            if not base_image:
+                continue
+            image_cache[xref] = base_image
+            if len(image_cache) > cache_size:
+                image_cache.popitem(last=False)
+        else:
+            image_cache.move_to_end(xref)
+        images.append({
+            'xref': xref,
+            'ext': base_image["ext"],
+            'bytes': base_image["image"],
+            'rect': rect
+        })
     return images
-def extract_images_from_pdf(pdf_path):
+_image_document = None
+def init_image_worker(pdf_path):
+    global _image_document
+    _image_document = fitz.open(pdf_path)
+def image_worker_extract(xref):
+    return _image_document.extract_image(xref)
+def extract_images_from_pdf(pdf_path, in_memory=False, workers=1, workspace=None):
     pdf_document = fitz.open(pdf_path)
+    try:
+        placements = [
+            (page_idx + 1, xref, rect)
+            for page_idx, page in enumerate(pdf_document)
+            for xref, rect in page_image_placements(page)
+        ]
+        xrefs = list(dict.fromkeys(xref for _, xref, _ in placements))
+        if workers > 1 and len(xrefs) > 1:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_image_worker,
+                initargs=(str(pdf_path),)
+            ) as executor:
+                chunksize = max(1, len(xrefs) // (workers * 4))
+                extracted = dict(zip(xrefs, executor.map(image_worker_extract, xrefs, chunksize=chunksize)))
+        else:
+            extracted = {xref: pdf_document.extract_image(xref) for xref in xrefs}
+    finally:
+        pdf_document.close()
+    sources = {}
+    if not in_memory and not workspace:
+        os.makedirs(TEMP_DIR, exist_ok=True)
+        prefix = uuid.uuid4().hex
+    for xref, base_image in extracted.items():
+        if not base_image:
+            continue
+        if in_memory:
+            sources[xref] = ('bytes', base_image["image"])
+            continue
+        if workspace:
+            sources[xref] = ('path', workspace.write(f"pdf_img_{xref}.{base_image['ext']}", base_image["image"]))
+            continue
+        image_path = os.path.join(TEMP_DIR, f"pdf_img_{prefix}_{xref}.{base_image['ext']}")
+        with open(image_path, 'wb') as img_file:
+            img_file.write(base_image["image"])
+        sources[xref] = ('path', image_path)
     images_data = []
-    temp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp")
-    os.makedirs(temp_dir, exist_ok=True)
-    for page_idx, page in enumerate(pdf_document):
-        image_list = page.get_images(full=True)
-        for img_idx, img_info in enumerate(image_list):
-            xref = img_info[0]
-            base_image = pdf_document.extract_image(xref)
-            image_bytes = base_image["image"]
-            image_ext = base_image["ext"]
-            image_path = os.path.join(temp_dir, f"pdf_img_{page_idx}_{img_idx}_{os.getpid()}.{image_ext}")
-            with open(image_path, 'wb') as img_file:
-                img_file.write(image_bytes)
-            rect = page.get_image_bbox(img_info)
-            images_data.append({
-                'page': page_idx + 1,
-                'path': image_path,
-                'rect': [rect.x0, rect.y0, rect.x1, rect.y1]
-            })
+    for page_number, xref, rect in placements:
+        if xref not in sources:
+            continue
+        key, value = sources[xref]
+        images_data.append({
+            'page': page_number,
+            'xref': xref,
+            'ext': extracted[xref]["ext"],
+            key: value,
+            'rect': rect
+        })
     return images_data 
+BLOCK_TYPES = ('text', 'header')
+class TextBlock:
+    __slots__ = ('text', 'confidence', 'coordinates', 'type')
+    def __init__(self, text, confidence=1.0, coordinates=None, block_type='text'):
+        self.text = text
+        self.confidence = confidence
+        self.coordinates = coordinates
+        self.type = block_type
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+    def to_dict(self):
+        coordinates = self.coordinates.tolist() if hasattr(self.coordinates, 'tolist') else self.coordinates
+        return {'text': self.text, 'confidence': float(self.confidence), 'coordinates': coordinates, 'type': self.type}
+def paddle_page_blocks(texts, polygons, scores):
+    scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+    types = ['header' if len(text) < 50 and score > 0.9 else 'text' for text, score in zip(texts, scores)]
+    return PageBlocks(texts, polygons, scores, types)
+def quad_array(polygons, count):
+    if not count:
+        return np.zeros((0, 4, 2), dtype=np.float32)
+    try:
+        quads = np.asarray(polygons, dtype=np.float32)
+        if quads.shape == (count, 4, 2):
+            return quads
+    except ValueError:
+        pass
+    quads = np.empty((count, 4, 2), dtype=np.float32)
+    for i, polygon in enumerate(polygons):
+        points = np.asarray(polygon, dtype=np.float32).reshape(-1, 2)
+        if len(points) != 4:
+            (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+            points = [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+        quads[i] = points
+    return quads
+class PageBlocks:
+    __slots__ = ('texts', 'polygons', 'confidences', 'types')
+    def __init__(self, texts=(), polygons=None, confidences=None, types=None):
+        self.texts = list(texts)
+        count = len(self.texts)
+        self.polygons = quad_array(polygons if polygons is not None else [], count)
+        if confidences is None:
+            confidences = np.ones(count)
+        self.confidences = np.asarray(confidences, dtype=np.float32).reshape(count)
+        if types is None:
+            self.types = np.zeros(count, dtype=np.uint8)
+        else:
+            self.types = np.array(
+                [BLOCK_TYPES.index(kind) if kind in BLOCK_TYPES else 0 for kind in types], dtype=np.uint8
+            ).reshape(count)
+    @classmethod
+    def from_blocks(cls, blocks):
+        if isinstance(blocks, cls):
+            return blocks
+        blocks = list(blocks)
+        return cls(
+            [block['text'] for block in blocks],
+            [block['coordinates'] for block in blocks],
+            [block.get('confidence', 1.0) for block in blocks],
+            [block.get('type', 'text') for block in blocks]
+        )
+    def __len__(self):
+        return len(self.texts)
+    def __getitem__(self, index):
+        return TextBlock(self.texts[index], float(self.confidences[index]), self.polygons[index],
+                         BLOCK_TYPES[self.types[index]])
+    def __iter__(self):
+        for index in range(len(self.texts)):
+            yield self[index]
+    def boxes(self):
+        return np.concatenate([self.polygons.min(axis=1), self.polygons.max(axis=1)], axis=1)
+    def to_dicts(self):
+        return [block.to_dict() for block in self]
+def find_column_gutters(boxes, min_gutter):
+    if len(boxes) < 2:
+        return np.zeros(0, dtype=np.float32)
+    left = int(np.floor(boxes[:, 0].min()))
+    right = int(np.ceil(boxes[:, 2].max()))
+    coverage = np.zeros(right - left + 2, dtype=np.int32)
+    np.add.at(coverage, (boxes[:, 0] - left).astype(np.int64), 1)
+    np.add.at(coverage, (boxes[:, 2] - left).astype(np.int64) + 1, -1)
+    occupied = np.cumsum(coverage)[:-1] > 0
+    edges = np.diff(np.concatenate(([1], occupied.astype(np.int8), [1])))
+    starts = np.flatnonzero(edges == -1)
+    ends = np.flatnonzero(edges == 1)
+    wide = (ends - starts) >= min_gutter
+    return ((starts[wide] + ends[wide]) / 2.0 + left).astype(np.float32)
+def join_paragraph_lines(lines):
+    text = lines[0]
+    for line in lines[1:]:
+        if len(text) > 1 and text.endswith('-') and text[-2].isalpha() and line[:1].islower():
+            text = text[:-1] + line
+        else:
+            text = f"{text} {line}"
+    return text
+def layout_page_elements(text_blocks, images=(), scale=1.0, merge_lines=True, span_ratio=0.55,
+                         line_tolerance=0.5, paragraph_gap=0.8, short_line_ratio=0.75, column_gap=0.8,
+                         word_gap=1.5, heading_ratio=1.2, max_heading_length=80):
+    text_blocks = PageBlocks.from_blocks(text_blocks)
+    count = len(text_blocks)
+    if not count and not images:
+        return []
+    boxes = text_blocks.boxes()
+    if images:
+        image_boxes = np.array([image['rect'] for image in images], dtype=np.float32) * scale
+        boxes = np.concatenate([boxes, image_boxes])
+    is_image = np.arange(len(boxes)) >= count
+    is_header = np.zeros(len(boxes), dtype=bool)
+    is_header[:count] = text_blocks.types == BLOCK_TYPES.index('header')
+    x0, y0, x1, y1 = boxes.T
+    heights = y1 - y0
+    text_heights = heights[~is_image & (heights > 0)]
+    line_height = float(np.median(text_heights)) if len(text_heights) else 1.0
+    content_width = float(x1.max() - x0.min()) or 1.0
+    candidates = (x1 - x0) > span_ratio * content_width
+    gutters = find_column_gutters(boxes[~candidates], column_gap * line_height)
+    first_column = np.searchsorted(gutters, x0)
+    last_column = np.searchsorted(gutters, x1)
+    spanning = first_column != last_column
+    column = np.where(spanning, -1, np.searchsorted(gutters, (x0 + x1) / 2.0))
+    center_y = (y0 + y1) / 2.0
+    band = np.searchsorted(np.sort(y0[spanning]), center_y, side='right')
+    order = np.lexsort((center_y, column, band))
+    group_change = np.ones(len(order), dtype=bool)
+    group_change[1:] = (band[order][1:] != band[order][:-1]) | (column[order][1:] != column[order][:-1])
+    new_line = group_change.copy()
+    if merge_lines:
+        new_line[1:] |= np.diff(center_y[order]) > line_tolerance * line_height
+        new_line |= is_image[order]
+        new_line[1:] |= is_image[order][:-1]
+    else:
+        new_line[:] = True
+    line_id = np.cumsum(new_line)
+    order = order[np.lexsort((x0[order], line_id))]
+    if merge_lines:
+        new_line[1:] |= x0[order][1:] - x1[order][:-1] > word_gap * line_height
+    starts = np.flatnonzero(new_line)
+    line_x0 = np.minimum.reduceat(x0[order], starts)
+    line_y0 = np.minimum.reduceat(y0[order], starts)
+    line_x1 = np.maximum.reduceat(x1[order], starts)
+    line_y1 = np.maximum.reduceat(y1[order], starts)
+    line_image = is_image[order][starts]
+    line_header = np.logical_or.reduceat(is_header[order], starts)
+    line_tall = (line_y1 - line_y0) >= heading_ratio * line_height
+    line_group = np.cumsum(group_change[starts])
+    group_starts = np.flatnonzero(group_change[starts])
+    group_right = np.maximum.reduceat(line_x1, group_starts)[line_group - 1]
+    group_left = np.minimum.reduceat(line_x0, group_starts)[line_group - 1]
+    new_paragraph = np.ones(len(starts), dtype=bool)
+    if merge_lines and len(starts) > 1:
+        overlap = np.minimum(line_x1[1:], line_x1[:-1]) - np.maximum(line_x0[1:], line_x0[:-1])
+        previous_width = line_x1[:-1] - line_x0[:-1]
+        new_paragraph[1:] = (
+            (line_group[1:] != line_group[:-1])
+            | line_image[1:] | line_image[:-1] | (line_tall[1:] != line_tall[:-1])
+            | (line_y0[1:] - line_y1[:-1] > paragraph_gap * line_height)
+            | (overlap <= 0)
+            | (line_x0[1:] - line_x0[:-1] > line_height)
+            | (previous_width < short_line_ratio * (group_right[:-1] - group_left[:-1]))
+        )
+    line_ends = np.append(starts[1:], len(order))
+    gap_above = np.full(len(starts), np.inf)
+    gap_above[1:] = np.where(line_group[1:] == line_group[:-1], line_y0[1:] - line_y1[:-1], np.inf)
+    line_texts = [
+        ' '.join(text_blocks.texts[i] for i in order[start:end]) if not line_image[k] else None
+        for k, (start, end) in enumerate(zip(starts, line_ends))
+    ]
+    for k in np.flatnonzero(~new_paragraph):
+        if is_list_item(line_texts[k]):
+            new_paragraph[k] = True
+    paragraph_starts = np.flatnonzero(new_paragraph)
+    paragraph_ends = np.append(paragraph_starts[1:], len(starts))
+    laid_out = []
+    for first, last in zip(paragraph_starts, paragraph_ends):
+        if line_image[first]:
+            laid_out.append(('image', images[order[starts[first]] - count]))
+            continue
+        members = order[starts[first]:line_ends[last - 1]]
+        header = bool(line_header[first])
+        if merge_lines:
+            text = line_texts[first]
+            header = (
+                last - first == 1 and len(text) <= max_heading_length and not is_list_item(text)
+                and not text.rstrip().endswith(('.', ',', ';'))
+                and bool(line_tall[first] or (line_header[first] and gap_above[first] > paragraph_gap * line_height))
+            )
+        if len(members) == 1:
+            block = text_blocks[members[0]]
+            block.type = 'header' if header else 'text'
+            laid_out.append(('text', block))
+            continue
+        px0, py0 = float(line_x0[first:last].min()), float(line_y0[first:last].min())
+        px1, py1 = float(line_x1[first:last].max()), float(line_y1[first:last].max())
+        laid_out.append(('text', TextBlock(
+            join_paragraph_lines(line_texts[first:last]),
+            float(text_blocks.confidences[members].min()),
+            [[px0, py0], [px1, py0], [px1, py1], [px0, py1]],
+            'header' if header else 'text'
+        )))
+    return laid_out
+def paragraph_style(block):
+    if block.get('type', 'text') == 'header':
+        return 'Heading 1'
+    stripped = block['text'].strip()
+    if stripped.startswith(('•', '-', '*')):
+        return 'List Bullet'
+    if stripped[:1].isdigit() and stripped[1:].startswith('. '):
+        return 'List Number'
+    return 'Normal'
+def load_docx_image(image):
+    data = image.get('bytes')
+    if data is None:
+        with open(image['path'], 'rb') as img_file:
+            data = img_file.read()
+    ext = image['ext'].lower()
+    if ext not in DOCX_IMAGE_FORMATS:
+        converted = io.BytesIO()
+        Image.open(io.BytesIO(data)).save(converted, format="PNG")
+        data = converted.getvalue()
+        ext = 'png'
+    return data, ext
+class DocxBuilder:
+    def __init__(self, profiler=None):
+        self.profiler = profiler
+        self.doc = docx.Document()
+        for section in self.doc.sections:
+            section.top_margin = Inches(1)
+            section.bottom_margin = Inches(1)
+            section.left_margin = Inches(1)
+            section.right_margin = Inches(1)
+        section = self.doc.sections[-1]
+        self.max_image_width = section.page_width - section.left_margin - section.right_margin
+        self.pages_added = 0
+    def add_page(self, page_data):
+        if self.pages_added:
+            self.add_page_break()
+        self.pages_added += 1
+        label = page_data.get('image_path')
+        with profile_stage(self.profiler, 'structure', label):
+            elements = layout_page_elements(
+                page_data['text_blocks'], page_data.get('images', []),
+                scale=page_data.get('dpi', 72) / 72.0,
+                merge_lines=not page_data.get('text_layer')
+            )
+        with profile_stage(self.profiler, 'docx_write', label):
+            self.write_elements(elements)
+        return elements
+    def add_page_break(self):
+        self.doc.add_page_break()
+    def write_elements(self, elements):
+        doc = self.doc
+        for kind, block in elements:
+            if kind == 'image':
+                self.add_image(block)
+                continue
+            p = doc.add_paragraph()
+            p.style = paragraph_style(block)
+            p.add_run(block['text'])
+    def add_image(self, image):
+        width_pt = image['rect'][2] - image['rect'][0]
+        if width_pt <= 0:
+            return
+        try:
+            data, _ = load_docx_image(image)
+            self.doc.add_picture(io.BytesIO(data), width=min(Pt(width_pt), self.max_image_width))
+        except Exception as e:
+            print(f"Ошибка при вставке изображения {image.get('xref')}: {str(e)}")
+    def save(self, output_path):
+        with profile_stage(self.profiler, 'docx_save'):
+            self.doc.save(output_path)
+        return output_path
+    def close(self):
+        pass
+DOCX_TEMPLATE = os.path.join(os.path.dirname(docx.__file__), "templates", "default.docx")
+DOCX_CONTENT_TYPES = {
+    'png': 'image/png', 'jpg': 'image/jpeg', 'jpeg': 'image/jpeg', 'jpe': 'image/jpeg', 'bmp': 'image/bmp',
+    'gif': 'image/gif', 'tif': 'image/tiff', 'tiff': 'image/tiff'
+}
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+def docx_run_xml(text):
+    parts = []
+    for piece in re.split(r'(\t|\r\n|\n|\r)', INVALID_XML_CHARS.sub('', text)):
+        if piece == '\t':
+            parts.append('<w:tab/>')
+        elif piece in ('\n', '\r', '\r\n'):
+            parts.append('<w:br/>')
+        elif piece:
+            parts.append(f'<w:t xml:space="preserve">{xml_escape(piece)}</w:t>')
+    return f"<w:r>{''.join(parts)}</w:r>" if parts else ''
+class StreamingDocxBuilder(DocxBuilder):
+    def __init__(self, output_path, profiler=None, template=DOCX_TEMPLATE, margin_twips=1440, workspace=None):
+        self.profiler = profiler
+        self.workspace = workspace
+        self.output_path = output_path
+        self.pages_added = 0
+        with zipfile.ZipFile(template) as template_archive:
+            self.template_parts = {name: template_archive.read(name) for name in template_archive.namelist()}
+        document_xml = self.template_parts.pop('word/document.xml').decode('utf-8')
+        self.style_ids = {
+            name.lower(): style_id for style_id, name in re.findall(
+                r'<w:style\b[^>]*w:styleId="([^"]*)"[^>]*>\s*<w:name w:val="([^"]*)"',
+                self.template_parts['word/styles.xml'].decode('utf-8')
+            )
+        }
+        self.section_xml = re.search(r'<w:sectPr\b.*?</w:sectPr>', document_xml, re.S).group(0)
+        for side in ('top', 'bottom', 'left', 'right'):
+            self.section_xml = re.sub(rf'w:{side}="\d+"', f'w:{side}="{margin_twips}"', self.section_xml)
+        page_width = int(re.search(r'<w:pgSz\b[^>]*w:w="(\d+)"', self.section_xml).group(1))
+        self.max_image_width = (page_width - 2 * margin_twips) * 635
+        self.media = workspace.temporary_file() if workspace else tempfile.TemporaryFile()
+        self.media_parts = {}
+        self.images_added = 0
+        self.temp_path = None
+        if isinstance(output_path, (str, os.PathLike)):
+            self.temp_path = f"{os.fspath(output_path)}.tmp"
+        self.archive = zipfile.ZipFile(self.temp_path or output_path, 'w', compression=zipfile.ZIP_DEFLATED)
+        self.document = self.archive.open('word/document.xml', 'w', force_zip64=True)
+        root = re.search(r'<w:document\b[^>]*>', document_xml).group(0)
+        self.document.write(f"<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n{root}<w:body>".encode('utf-8'))
+    def add_page_break(self):
+        self.document.write(b'<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+    def write_elements(self, elements):
+        chunks = []
+        for kind, block in elements:
+            if kind == 'image':
+                chunks.append(self.add_image(block))
+                continue
+            style_id = self.style_ids.get(paragraph_style(block).lower(), 'Normal')
+            properties = f'<w:pPr><w:pStyle w:val="{style_id}"/></w:pPr>' if style_id != 'Normal' else ''
+            chunks.append(f"<w:p>{properties}{docx_run_xml(block['text'])}</w:p>")
+        self.document.write(''.join(chunks).encode('utf-8'))
+    def add_image(self, image):
+        width_pt = image['rect'][2] - image['rect'][0]
+        if width_pt <= 0:
+            return ''
+        try:
+            data, ext = load_docx_image(image)
+            pixel_width, pixel_height = Image.open(io.BytesIO(data)).size
+        except Exception as e:
+            print(f"Ошибка при вставке изображения {image.get('xref')}: {str(e)}")
+            return ''
+        digest = hashlib.sha1(data).hexdigest()
+        if digest not in self.media_parts:
+            if self.workspace:
+                self.workspace.reserve(len(data))
+            number = len(self.media_parts) + 1
+            self.media.seek(0, os.SEEK_END)
+            self.media_parts[digest] = (f"rIdImage{number}", f"image{number}.{ext}", self.media.tell(), len(data))
+            self.media.write(data)
+        rel_id, name, _, _ = self.media_parts[digest]
+        cx = int(min(width_pt * 12700, self.max_image_width))
+        cy = int(cx * pixel_height / max(1, pixel_width))
+        self.images_added += 1
+        shape_id = self.images_added
+        return (
+            f'<w:p><w:r><w:drawing><wp:inline distT="0" distB="0" distL="0" distR="0">'
+            f'<wp:extent cx="{cx}" cy="{cy}"/><wp:docPr id="{shape_id}" name="Picture {shape_id}"/>'
+            f'<wp:cNvGraphicFramePr><a:graphicFrameLocks xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+            f'<a:graphic xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">'
+            f'<a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+            f'<pic:pic xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+            f'<pic:nvPicPr><pic:cNvPr id="0" name="{name}"/><pic:cNvPicPr/></pic:nvPicPr>'
+            f'<pic:blipFill><a:blip r:embed="{rel_id}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+            f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+            f'<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr></pic:pic>'
+            f'</a:graphicData></a:graphic></wp:inline></w:drawing></w:r></w:p>'
+        )
+    def save(self, output_path=None):
+        with profile_stage(self.profiler, 'docx_save'):
+            self.document.write(f"{self.section_xml}</w:body></w:document>".encode('utf-8'))
+            self.document.close()
+            rels = self.template_parts['word/_rels/document.xml.rels'].decode('utf-8')
+            content_types = self.template_parts['[Content_Types].xml'].decode('utf-8')
+            relationships = []
+            extensions = set()
+            for rel_id, name, offset, size in self.media_parts.values():
+                self.media.seek(offset)
+                self.archive.writestr(f"word/media/{name}", self.media.read(size))
+                relationships.append(
+                    f'<Relationship Id="{rel_id}" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                    f'relationships/image" Target="media/{name}"/>'
+                )
+                extensions.add(name.rsplit('.', 1)[1])
+            defaults = ''.join(
+                f'<Default Extension="{ext}" ContentType="{DOCX_CONTENT_TYPES[ext]}"/>'
+                for ext in sorted(extensions) if f'Extension="{ext}"' not in content_types
+            )
+            self.template_parts['word/_rels/document.xml.rels'] = rels.replace(
+                '</Relationships>', ''.join(relationships) + '</Relationships>').encode('utf-8')
+            self.template_parts['[Content_Types].xml'] = content_types.replace(
+                '<Override ', defaults + '<Override ', 1).encode('utf-8')
+            for name, data in self.template_parts.items():
+                self.archive.writestr(name, data)
+            self.archive.close()
+            if self.temp_path:
+                os.replace(self.temp_path, self.output_path)
+            self.close()
+        return self.output_path
+    def close(self):
+        if not self.document.closed:
+            self.document.close()
+        self.archive.close()
+        self.media.close()
+        if self.temp_path and os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
 def save_docx_file(recognized_data, output_path):
-    doc = docx.Document()
-    sections = doc.sections
-    for section in sections:
-        section.top_margin = Inches(1)
-        section.bottom_margin = Inches(1)
-        section.left_margin = Inches(1)
-        section.right_margin = Inches(1)
+    builder = DocxBuilder()
     for page_data in recognized_data:
-        text_blocks = sorted(page_data['text_blocks'], 
-                            key=lambda block: block['coordinates'][0][1])
-        for block in text_blocks:
-            text = block['text']
-            block_type = block.get('type', 'text')
-            if block_type == 'header':
-                p = doc.add_paragraph()
-                p.style = 'Heading 1'
-                p.add_run(text)
-            else:
-                p = doc.add_paragraph()
-                p.style = 'Normal'
-                p.add_run(text)
-                if text.strip().startswith(('•', '-', '*')):
-                    p.style = 'List Bullet'
-                elif text.strip()[0].isdigit() and text.strip()[1:].startswith('. '):
-                    p.style = 'List Number'
-        if page_data != recognized_data[-1]:
-            doc.add_page_break()
-    doc.save(output_path)
-    return output_path
+        builder.add_page(page_data)
+    return builder.save(output_path)
+STRUCTURED_FORMATS = ("jsonl", "hocr")
+ELEMENT_TYPES = {'Heading 1': 'heading', 'List Bullet': 'list_item', 'List Number': 'list_item'}
+def structured_format_for(path):
+    return 'hocr' if get_file_extension(str(path)).lower() in ('hocr', 'html', 'htm') else 'jsonl'
+def structured_path_for(output_path, output_format='jsonl'):
+    return f"{os.path.splitext(output_path)[0]}.{output_format}"
+def element_bbox(coordinates):
+    points = np.asarray(coordinates, dtype=np.float32).reshape(-1, 2)
+    return [round(float(value), 1) for value in (*points.min(axis=0), *points.max(axis=0))]
+def page_structure(page_data, elements, page_number):
+    scale = page_data.get('dpi', 72) / 72.0
+    structure = {
+        'page_number': page_number,
+        'source': page_data.get('image_path'),
+        'dpi': page_data.get('dpi'),
+        'text_layer': bool(page_data.get('text_layer')),
+        'elements': []
+    }
+    if page_data.get('page_size'):
+        structure['size'] = [round(side * scale) for side in page_data['page_size']]
+    if 'error' in page_data:
+        structure['error'] = page_data['error']
+    for kind, block in elements:
+        if kind == 'image':
+            structure['elements'].append({
+                'type': 'image',
+                'bbox': [round(float(value) * scale, 1) for value in block['rect']]
+            })
+            continue
+        structure['elements'].append({
+            'type': ELEMENT_TYPES.get(paragraph_style(block), 'paragraph'),
+            'text': block['text'],
+            'confidence': round(float(block['confidence']), 4),
+            'bbox': element_bbox(block['coordinates'])
+        })
+    return structure
+class JsonLinesWriter:
+    def __init__(self, path):
+        self.path = path
+        self.pages_added = 0
+        self.saved = False
+        self.file = open(path, 'w', encoding='utf-8')
+    def add_page(self, page_data, elements):
+        self.pages_added += 1
+        self.write_page(page_structure(page_data, elements, self.pages_added))
+        self.file.flush()
+    def write_page(self, structure):
+        self.file.write(json.dumps(structure, ensure_ascii=False) + '\n')
+    def save(self):
+        self.saved = True
+        self.close()
+        return self.path
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+        if not self.saved and os.path.exists(self.path):
+            os.remove(self.path)
+class HocrWriter(JsonLinesWriter):
+    def __init__(self, path):
+        super().__init__(path)
+        self.file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" '
+            '"http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">\n'
+            '<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="ru" lang="ru">\n<head>\n'
+            '<title></title>\n<meta http-equiv="Content-Type" content="text/html;charset=utf-8"/>\n'
+            '<meta name="ocr-system" content="pdf_to_docx"/>\n'
+            '<meta name="ocr-capabilities" content="ocr_page ocr_par ocr_photo"/>\n</head>\n<body>\n'
+        )
+    def write_page(self, structure):
+        number = structure['page_number']
+        boxes = [element['bbox'] for element in structure['elements']]
+        width, height = structure.get('size') or (
+            [round(max(box[2] for box in boxes)), round(max(box[3] for box in boxes))] if boxes else [0, 0]
+        )
+        title = f"bbox 0 0 {width} {height}; ppageno {number - 1}"
+        if structure['source']:
+            title = f'image "{structure["source"]}"; {title}'
+        if structure['dpi']:
+            title += f"; scan_res {structure['dpi']} {structure['dpi']}"
+        chunks = [f'<div class="ocr_page" id="page_{number}" title="{xml_escape(title, {chr(34): "&quot;"})}">\n']
+        for index, element in enumerate(structure['elements'], 1):
+            bbox = ' '.join(str(round(value)) for value in element['bbox'])
+            if element['type'] == 'image':
+                chunks.append(f'<div class="ocr_photo" id="photo_{number}_{index}" title="bbox {bbox}"></div>\n')
+                continue
+            chunks.append(
+                f'<p class="ocr_par" id="par_{number}_{index}" data-type="{element["type"]}" '
+                f'title="bbox {bbox}; x_wconf {round(element["confidence"] * 100)}">'
+                f'{xml_escape(INVALID_XML_CHARS.sub("", element["text"]))}</p>\n'
+            )
+        chunks.append('</div>\n')
+        self.file.write(''.join(chunks))
+    def save(self):
+        if not self.file.closed:
+            self.file.write('</body>\n</html>\n')
+        return super().save()
+STRUCTURED_WRITERS = {'jsonl': JsonLinesWriter, 'hocr': HocrWriter}
+def open_structured_output(path, output_format=None):
+    output_format = output_format or structured_format_for(path)
+    if output_format not in STRUCTURED_WRITERS:
+        raise ValueError(f"Неизвестный формат структурированного вывода: {output_format}. "
+                         f"Доступны: {', '.join(STRUCTURED_FORMATS)}")
+    return STRUCTURED_WRITERS[output_format](path)
 def extract_text_from_pdf(pdf_path):
     pdf_document = fitz.open(pdf_path)
     text_blocks = []
@@ -159,8 +811,576 @@ def extract_text_from_pdf(pdf_path):
                                [block[2], block[3]], [block[0], block[3]]]
             })
     return text_blocks
-class OCRProcessor:
+def classify_pdf_page(page, min_glyphs=50, min_text_coverage=0.02, max_bad_glyph_ratio=0.1):
+    page_area = page.rect.width * page.rect.height
+    if page_area <= 0:
+        return 'scan'
+    glyphs = 0
+    bad_glyphs = 0
+    text_area = 0.0
+    for block in page.get_text("blocks"):
+        if block[6] != 0:
+            continue
+        text = ''.join(block[4].split())
+        glyphs += len(text)
+        bad_glyphs += text.count('\ufffd')
+        text_area += max(0.0, block[2] - block[0]) * max(0.0, block[3] - block[1])
+    if glyphs < min_glyphs or bad_glyphs > max_bad_glyph_ratio * glyphs:
+        return 'scan'
+    image_area = 0.0
+    for image_info in page.get_image_info():
+        bbox = fitz.Rect(image_info['bbox']) & page.rect
+        image_area += bbox.width * bbox.height
+    text_coverage = min(1.0, text_area / page_area)
+    image_coverage = min(1.0, image_area / page_area)
+    if text_coverage < min_text_coverage and image_coverage > 0.5:
+        return 'scan'
+    return 'text'
+def extract_page_text_blocks(page, dpi=300, heading_ratio=1.2):
+    texts = []
+    rects = []
+    styles = []
+    sizes = collections.Counter()
+    for block in page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT, sort=True)['blocks']:
+        if block['type'] != 0:
+            continue
+        spans = [span for line in block['lines'] for span in line['spans'] if span['text'].strip()]
+        text = ' '.join(' '.join(span['text'] for span in line['spans']) for line in block['lines'])
+        text = ' '.join(text.split())
+        if not text:
+            continue
+        for span in spans:
+            sizes[round(span['size'], 1)] += len(span['text'])
+        texts.append(text)
+        rects.append(block['bbox'])
+        styles.append((
+            max(span['size'] for span in spans),
+            all(span['flags'] & fitz.TEXT_FONT_BOLD for span in spans),
+            len(block['lines'])
+        ))
+    body_size = sizes.most_common(1)[0][0] if sizes else 0.0
+    x0, y0, x1, y1 = (np.array(rects, dtype=np.float32).reshape(-1, 4) * (dpi / 72.0)).T
+    polygons = np.stack([np.stack([x0, y0], 1), np.stack([x1, y0], 1),
+                         np.stack([x1, y1], 1), np.stack([x0, y1], 1)], axis=1)
+    types = [
+        'header' if len(text) <= 100 and not is_list_item(text)
+        and (size >= heading_ratio * body_size or (bold and lines <= 2)) else 'text'
+        for text, (size, bold, lines) in zip(texts, styles)
+    ]
+    return PageBlocks(texts, polygons, None, types)
+def pixmap_to_array(pixmap):
+    samples = np.frombuffer(pixmap.samples, dtype=np.uint8)
+    rows = samples.reshape(pixmap.height, pixmap.stride)[:, :pixmap.width * pixmap.n]
+    return rows.reshape(pixmap.height, pixmap.width, pixmap.n)
+def render_pdf_page(page, dpi=300):
+    pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csRGB, alpha=False)
+    return pixmap_to_array(pixmap)
+def render_pdf_pages(pdf_path, dpi=300, pages=None):
+    pdf_document = fitz.open(pdf_path)
+    try:
+        page_indexes = range(pdf_document.page_count) if pages is None else pages
+        for page_idx in page_indexes:
+            yield page_idx, render_pdf_page(pdf_document[page_idx], dpi)
+    finally:
+        pdf_document.close()
+def load_rgb_image(image):
+    if isinstance(image, Image.Image):
+        return image.convert("RGB")
+    if isinstance(image, np.ndarray):
+        return Image.fromarray(image).convert("RGB")
+    return Image.open(image).convert("RGB")
+def to_bgr_array(image):
+    if isinstance(image, (str, os.PathLike)):
+        return str(image)
+    if isinstance(image, Image.Image):
+        image = np.asarray(image.convert("RGB"))
+    if image.ndim == 2:
+        image = np.stack([image] * 3, axis=-1)
+    return np.ascontiguousarray(image[:, :, 2::-1])
+def to_gray_array(image):
+    if isinstance(image, np.ndarray):
+        if image.ndim == 2:
+            return image
+        return np.asarray(Image.fromarray(np.ascontiguousarray(image[:, :, :3])).convert("L"))
+    return np.asarray(load_rgb_image(image).convert("L"))
+def otsu_threshold(gray):
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_bg = np.cumsum(histogram)
+    weight_fg = weight_bg[-1] - weight_bg
+    cumulative_mean = np.cumsum(histogram * levels)
+    mean_bg = cumulative_mean / np.maximum(weight_bg, 1)
+    mean_fg = (cumulative_mean[-1] - cumulative_mean) / np.maximum(weight_fg, 1)
+    return int(np.argmax(weight_bg * weight_fg * (mean_bg - mean_fg) ** 2)) + 1
+def segment_text_lines(image, min_height=6, padding=4):
+    gray = to_gray_array(image)
+    return ink_line_boxes(gray < otsu_threshold(gray), min_height, padding)
+def ink_line_boxes(ink, min_height=6, padding=4):
+    active = ink.sum(axis=1) > max(1, int(ink.shape[1] * 0.002))
+    edges = np.flatnonzero(np.diff(np.concatenate([[False], active, [False]]).astype(np.int8)))
+    starts, ends = edges[0::2], edges[1::2]
+    if not len(starts):
+        return []
+    keep = (starts[1:] - ends[:-1]) > max(1, min_height // 2)
+    starts = starts[np.concatenate([[True], keep])]
+    ends = ends[np.concatenate([keep, [True]])]
+    height, width = ink.shape
+    boxes = []
+    for y0, y1 in zip(starts, ends):
+        if y1 - y0 < min_height:
+            continue
+        columns = np.flatnonzero(ink[y0:y1].any(axis=0))
+        boxes.append((
+            max(0, int(columns[0]) - padding),
+            max(0, int(y0) - padding),
+            min(width, int(columns[-1]) + 1 + padding),
+            min(height, int(y1) + padding)
+        ))
+    return boxes
+def estimate_skew(ink, max_angle=5.0, max_points=50000):
+    ys, xs = np.nonzero(ink)
+    if len(ys) < 100:
+        return 0.0
+    if len(ys) > max_points:
+        picked = np.linspace(0, len(ys) - 1, max_points).astype(np.int64)
+        ys, xs = ys[picked], xs[picked]
+    ys = ys.astype(np.float32)
+    xs = xs.astype(np.float32)
+    def best_angle(angles):
+        projected = ys[None, :] - xs[None, :] * np.tan(np.radians(angles)).astype(np.float32)[:, None]
+        rows = (projected - projected.min()).astype(np.int64)
+        bins = int(rows.max()) + 1
+        rows += np.arange(len(angles))[:, None] * bins
+        profile = np.bincount(rows.ravel(), minlength=len(angles) * bins).reshape(len(angles), bins)
+        return float(angles[np.argmax((profile.astype(np.float64) ** 2).sum(axis=1))])
+    coarse = best_angle(np.arange(-max_angle, max_angle + 0.25, 0.5))
+    return round(best_angle(np.arange(coarse - 0.5, coarse + 0.525, 0.05)), 2)
+def content_bounds(ink, margin=0):
+    height, width = ink.shape
+    rows = np.flatnonzero(ink.sum(axis=1) > max(1, int(width * 0.002)))
+    columns = np.flatnonzero(ink.sum(axis=0) > max(1, int(height * 0.002)))
+    if not len(rows) or not len(columns):
+        return 0, 0, width, height
+    return (max(0, int(columns[0]) - margin), max(0, int(rows[0]) - margin),
+            min(width, int(columns[-1]) + 1 + margin), min(height, int(rows[-1]) + 1 + margin))
+def is_upright_page(line_boxes, min_lines=3, ratio=2.0, slack=2.0):
+    if len(line_boxes) < min_lines:
+        return False
+    boxes = np.asarray(line_boxes, dtype=np.float64)
+    left_spread = np.median(np.abs(boxes[:, 0] - np.median(boxes[:, 0])))
+    right_spread = np.median(np.abs(boxes[:, 2] - np.median(boxes[:, 2])))
+    return bool(right_spread > ratio * left_spread + slack)
+def preprocess_page(image, deskew=True, crop=True, grayscale=False, binarize=False, max_side=None, margin=16,
+                    min_skew=0.1, max_skew=5.0, sample_width=1000):
+    pixels = image if isinstance(image, np.ndarray) else np.asarray(load_rgb_image(image))
+    gray = to_gray_array(pixels)
+    if grayscale or binarize:
+        pixels = gray
+    step = max(1, gray.shape[1] // sample_width)
+    threshold = otsu_threshold(gray[::step, ::step])
+    ink = gray < threshold
+    angle = estimate_skew(ink[::step, ::step], max_skew) if deskew else 0.0
+    if abs(angle) < min_skew:
+        angle = 0.0
+    x0, y0 = 0, 0
+    if crop:
+        x0, y0, x1, y1 = content_bounds(ink, margin)
+        pixels, ink = pixels[y0:y1, x0:x1], ink[y0:y1, x0:x1]
+    center = (x0 + pixels.shape[1] / 2, y0 + pixels.shape[0] / 2)
+    if angle:
+        fill = 255 if pixels.ndim == 2 else (255,) * pixels.shape[2]
+        pixels = np.asarray(Image.fromarray(pixels).rotate(angle, resample=Image.Resampling.BILINEAR,
+                                                            fillcolor=fill))
+        ink = to_gray_array(pixels) < threshold
+        if crop:
+            left, top, right, bottom = content_bounds(ink, margin)
+            pixels, ink = pixels[top:bottom, left:right], ink[top:bottom, left:right]
+            x0, y0 = x0 + left, y0 + top
+    upright = is_upright_page(ink_line_boxes(ink, padding=0))
+    if binarize:
+        pixels = np.where(ink, 0, 255).astype(np.uint8)
+    scale = 1.0
+    if max_side and max(pixels.shape[:2]) > max_side:
+        scale = max_side / max(pixels.shape[:2])
+        size = (max(1, round(pixels.shape[1] * scale)), max(1, round(pixels.shape[0] * scale)))
+        pixels = np.asarray(Image.fromarray(pixels).resize(size, Image.Resampling.BOX))
+    transform = {
+        'angle': angle,
+        'offset': (x0, y0),
+        'scale': scale,
+        'center': center,
+        'upright': upright
+    }
+    return np.ascontiguousarray(pixels), transform
+def unmap_page_blocks(text_blocks, transform):
+    points = text_blocks.polygons / transform['scale'] + np.asarray(transform['offset'], dtype=np.float32)
+    if transform['angle']:
+        center = np.asarray(transform['center'], dtype=np.float32)
+        radians = np.radians(transform['angle'])
+        cos, sin = np.cos(radians), np.sin(radians)
+        shifted = points - center
+        points = np.stack([
+            shifted[..., 0] * cos - shifted[..., 1] * sin,
+            shifted[..., 0] * sin + shifted[..., 1] * cos
+        ], axis=-1) + center
+    return PageBlocks(text_blocks.texts, points, text_blocks.confidences,
+                      [BLOCK_TYPES[kind] for kind in text_blocks.types])
+def quad_crop(image, quad):
+    quad = np.asarray(quad, dtype=np.float32)
+    width = max(1, int(round(max(np.linalg.norm(quad[0] - quad[1]), np.linalg.norm(quad[3] - quad[2])))))
+    height = max(1, int(round(max(np.linalg.norm(quad[0] - quad[3]), np.linalg.norm(quad[1] - quad[2])))))
+    crop = image.transform((width, height), Image.Transform.QUAD, quad[[0, 3, 2, 1]].ravel().tolist(),
+                           resample=Image.Resampling.BICUBIC)
+    if height >= width * 1.5:
+        crop = crop.rotate(90, expand=True)
+    return crop
+def choose_page_dpi(page, target_line_height=32, min_dpi=100, max_dpi=300, probe_dpi=100):
+    sizes = [
+        span['size']
+        for block in page.get_text("dict")['blocks'] if block.get('type') == 0
+        for line in block['lines']
+        for span in line['spans'] if span['text'].strip()
+    ]
+    if sizes:
+        text_height_pt = float(np.percentile(sizes, 25))
+    else:
+        boxes = segment_text_lines(render_pdf_page(page, probe_dpi), min_height=3, padding=0)
+        if not boxes:
+            return max_dpi
+        heights = np.array([y1 - y0 for _, y0, _, y1 in boxes], dtype=np.float64)
+        text_height_pt = float(np.percentile(heights, 25)) * 72.0 / probe_dpi
+    if text_height_pt <= 0:
+        return max_dpi
+    dpi = int(round(target_line_height * 72.0 / text_height_pt / 10.0)) * 10
+    return max(min_dpi, min(max_dpi, dpi))
+def parse_dpi(value):
+    if str(value).lower() == 'auto':
+        return 'auto'
+    try:
+        dpi = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"DPI должно быть числом или 'auto': {value}")
+    if dpi <= 0:
+        raise argparse.ArgumentTypeError(f"DPI должно быть положительным: {value}")
+    return dpi
+def count_input_pages(paths):
+    total = 0
+    for file_path in paths:
+        if get_file_extension(str(file_path)).lower() == 'pdf':
+            with fitz.open(file_path) as pdf_document:
+                total += pdf_document.page_count
+        else:
+            total += 1
+    return total
+class ConversionCancelled(Exception):
+    def __init__(self, reason):
+        super().__init__(f"Конвертация остановлена: {reason}")
+        self.reason = reason
+        self.pages_done = 0
+        self.partial_path = None
+        self.recognized_data = None
+class CancellationToken:
+    def __init__(self, timeout=None, page_budget=None):
+        self.event = threading.Event()
+        self.reason = None
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.page_budget = page_budget
+        self.page_started = time.monotonic()
+        self.page_allowance = 1
+    def cancel(self, reason="отменено пользователем"):
+        self.reason = reason
+        self.event.set()
+    def is_cancelled(self):
+        return self.event.is_set()
+    def start_page(self, pages=1):
+        self.page_started = time.monotonic()
+        self.page_allowance = pages
+    def check(self):
+        if self.event.is_set():
+            raise ConversionCancelled(self.reason)
+        now = time.monotonic()
+        if self.deadline is not None and now > self.deadline:
+            raise ConversionCancelled("превышен срок выполнения задания")
+        if self.page_budget is not None and now - self.page_started > self.page_budget * self.page_allowance:
+            raise ConversionCancelled(f"страница обрабатывалась дольше {self.page_budget} с")
+def read_ocr_checkpoint(checkpoint_path, settings):
+    pages = {}
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return pages
+    with open(checkpoint_path, encoding='utf-8') as checkpoint:
+        for line in checkpoint:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('settings') == settings and record.get('fingerprint'):
+                pages[record['fingerprint']] = record
+    return pages
+def checkpoint_path_for(output_path):
+    return f"{output_path}.ocr.jsonl"
+def ocr_record(page_data, engine):
+    return {
+        'page': page_data['image_path'],
+        'engine': engine,
+        'dpi': page_data.get('dpi'),
+        'text_layer': bool(page_data.get('text_layer')),
+        'text_blocks': PageBlocks.from_blocks(page_data['text_blocks']).to_dicts()
+    }
+def write_ocr_checkpoint(checkpoint, page_data, engine, settings):
+    record = dict(ocr_record(page_data, engine), fingerprint=page_data['fingerprint'], settings=settings)
+    checkpoint.write(json.dumps(record, ensure_ascii=False) + '\n')
+    checkpoint.flush()
+    os.fsync(checkpoint.fileno())
+def checkpoint_pages(pages, checkpoint, engine, settings):
+    for page_data in pages:
+        if not page_data.get('checkpointed') and 'error' not in page_data:
+            write_ocr_checkpoint(checkpoint, page_data, engine, settings)
+        yield page_data
+def checkpointed_item(item, record):
+    item['text_blocks'] = PageBlocks.from_blocks(record['text_blocks'])
+    item['dpi'] = record.get('dpi') or item['dpi']
+    item['text_layer'] = record.get('text_layer', False)
+    item['checkpointed'] = True
+    return item
+def page_fingerprint(pdf_document, page):
+    digest = hashlib.sha256(repr((tuple(page.rect), page.rotation)).encode())
+    digest.update(page.read_contents())
+    xrefs = {image[0] for image in page.get_images(full=True)}
+    xrefs.update(xobject[0] for xobject in page.get_xobjects())
+    for xref in sorted(xrefs):
+        digest.update(pdf_document.xref_stream_raw(xref) or b'')
+    return digest.hexdigest()
+def file_fingerprint(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+def manifest_path_for(output_path):
+    return f"{output_path}.manifest.jsonl"
+class PageManifest:
+    def __init__(self, path, settings):
+        self.path = path
+        self.engine = settings.get('engine')
+        self.settings = settings_digest(settings)
+        self.records = {}
+        self.reused = 0
+        self.file = None
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as manifest:
+                for line in manifest:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get('settings') == self.settings and record.get('fingerprint'):
+                        self.records[record['fingerprint']] = record
+    def lookup(self, fingerprint):
+        record = self.records.get(fingerprint)
+        if record is not None:
+            self.reused += 1
+        return record
+    def add(self, page_data):
+        if 'error' in page_data or not page_data.get('fingerprint'):
+            return
+        if self.file is None:
+            self.file = open(f"{self.path}.tmp", 'w', encoding='utf-8')
+        record = dict(ocr_record(page_data, self.engine), fingerprint=page_data['fingerprint'], settings=self.settings)
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+    def commit(self):
+        if self.file is None:
+            self.file = open(f"{self.path}.tmp", 'w', encoding='utf-8')
+        self.file.close()
+        self.file = None
+        os.replace(f"{self.path}.tmp", self.path)
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            os.remove(f"{self.path}.tmp")
+def manifest_settings(ocr_processor, engine, text_layer=True, dpi=300):
+    return dict(ocr_processor.cache_settings(engine), text_layer=text_layer, dpi=dpi)
+def settings_digest(settings):
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+def stored_page_record(fingerprint, checkpoint=None, manifest=None):
+    record = checkpoint.get(fingerprint) if checkpoint else None
+    if record is None and manifest is not None:
+        record = manifest.lookup(fingerprint)
+    return record
+def iter_input_pages(paths, text_layer=True, dpi=300, embed_images=True, profiler=None, checkpoint=None,
+                     manifest=None):
+    base_dpi = 300 if dpi == 'auto' else dpi
+    fingerprints = checkpoint is not None or manifest is not None
+    for file_path in paths:
+        if get_file_extension(str(file_path)).lower() != 'pdf':
+            item = {'image_path': str(file_path), 'image': file_path, 'text_blocks': None, 'dpi': base_dpi}
+            record = None
+            if fingerprints:
+                with profile_stage(profiler, 'fingerprint', item['image_path']):
+                    item['fingerprint'] = file_fingerprint(file_path)
+                record = stored_page_record(item['fingerprint'], checkpoint, manifest)
+            if record:
+                checkpointed_item(item, record)
+            yield item
+            continue
+        pdf_document = fitz.open(file_path)
+        image_cache = collections.OrderedDict()
+        try:
+            for page_idx, page in enumerate(pdf_document):
+                label = f"{file_path}#page={page_idx + 1}"
+                item = {'image_path': label, 'image': None, 'text_blocks': None, 'dpi': base_dpi,
+                        'page_size': (page.rect.width, page.rect.height)}
+                record = None
+                if fingerprints:
+                    with profile_stage(profiler, 'fingerprint', label):
+                        item['fingerprint'] = page_fingerprint(pdf_document, page)
+                    record = stored_page_record(item['fingerprint'], checkpoint, manifest)
+                if record:
+                    checkpointed_item(item, record)
+                    if embed_images:
+                        with profile_stage(profiler, 'image_extraction', label):
+                            item['images'] = extract_page_images(
+                                pdf_document, page, image_cache,
+                                max_coverage=None if item['text_layer'] else 0.5
+                            )
+                    yield item
+                    continue
+                with profile_stage(profiler, 'text_layer', label):
+                    is_text_page = text_layer and classify_pdf_page(page) == 'text'
+                    if is_text_page:
+                        item['text_blocks'] = extract_page_text_blocks(page, base_dpi)
+                        item['text_layer'] = True
+                if not is_text_page:
+                    if dpi == 'auto':
+                        with profile_stage(profiler, 'dpi_selection', label):
+                            item['dpi'] = choose_page_dpi(page)
+                    with profile_stage(profiler, 'rasterize', label) as measurement:
+                        item['image'] = render_pdf_page(page, item['dpi'])
+                        measurement['pixels'] = item['image'].shape[0] * item['image'].shape[1]
+                if embed_images:
+                    with profile_stage(profiler, 'image_extraction', label):
+                        item['images'] = extract_page_images(
+                            pdf_document, page, image_cache,
+                            max_coverage=None if is_text_page else 0.5
+                        )
+                yield item
+        finally:
+            pdf_document.close()
+def page_result(item, page_data):
+    result = {key: value for key, value in item.items() if key not in ('image', 'text_blocks')}
+    result.update(page_data)
+    return result
+class PipelineProfiler:
     def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.pages = {}
+    def stage(self, name, page=None, pixels=0):
+        return self._measure(name, page, pixels)
+    @contextlib.contextmanager
+    def _measure(self, name, page, pixels):
+        measurement = {'pixels': pixels}
+        started = time.perf_counter()
+        try:
+            yield measurement
+        finally:
+            self.record(name, time.perf_counter() - started, page, measurement['pixels'])
+    def record(self, name, seconds, page=None, pixels=0):
+        with self.lock:
+            stage = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'pixels': 0})
+            stage['seconds'] += seconds
+            stage['calls'] += 1
+            stage['pixels'] += pixels
+            if page is not None:
+                page_stats = self.pages.setdefault(page, {'page': page, 'seconds': 0.0, 'pixels': 0, 'stages': {}})
+                page_stats['seconds'] += seconds
+                page_stats['pixels'] += pixels
+                page_stats['stages'][name] = page_stats['stages'].get(name, 0.0) + seconds
+    def record_page_timings(self, page_data):
+        for name, seconds in page_data.get('timings', {}).items():
+            self.record(name, seconds, page_data.get('image_path'))
+    @staticmethod
+    def peak_rss_bytes():
+        if resource is None:
+            return None, None
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale)
+    def report(self):
+        peak_rss, peak_rss_children = self.peak_rss_bytes()
+        with self.lock:
+            return {
+                'wall_seconds': time.perf_counter() - self.started,
+                'peak_rss_bytes': peak_rss,
+                'peak_rss_children_bytes': peak_rss_children,
+                'stages': {name: dict(stage) for name, stage in self.stages.items()},
+                'pages': [dict(page, stages=dict(page['stages'])) for page in self.pages.values()]
+            }
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as report_file:
+            json.dump(self.report(), report_file, ensure_ascii=False, indent=2)
+    def prometheus_text(self):
+        report = self.report()
+        lines = [
+            "# HELP pdf_to_docx_stage_seconds_total Время, проведенное в этапе конвейера.",
+            "# TYPE pdf_to_docx_stage_seconds_total counter"
+        ]
+        lines.extend(f'pdf_to_docx_stage_seconds_total{{stage="{name}"}} {stage["seconds"]:.6f}'
+                     for name, stage in report['stages'].items())
+        lines.extend([
+            "# HELP pdf_to_docx_stage_calls_total Число вызовов этапа конвейера.",
+            "# TYPE pdf_to_docx_stage_calls_total counter"
+        ])
+        lines.extend(f'pdf_to_docx_stage_calls_total{{stage="{name}"}} {stage["calls"]}'
+                     for name, stage in report['stages'].items())
+        lines.extend([
+            "# HELP pdf_to_docx_stage_pixels_total Число обработанных пикселей.",
+            "# TYPE pdf_to_docx_stage_pixels_total counter"
+        ])
+        lines.extend(f'pdf_to_docx_stage_pixels_total{{stage="{name}"}} {stage["pixels"]}'
+                     for name, stage in report['stages'].items())
+        lines.extend([
+            "# HELP pdf_to_docx_pages_total Число обработанных страниц.",
+            "# TYPE pdf_to_docx_pages_total counter",
+            f"pdf_to_docx_pages_total {len(report['pages'])}",
+            "# HELP pdf_to_docx_wall_seconds Общее время работы.",
+            "# TYPE pdf_to_docx_wall_seconds gauge",
+            f"pdf_to_docx_wall_seconds {report['wall_seconds']:.6f}"
+        ])
+        if report['peak_rss_bytes'] is not None:
+            lines.extend([
+                "# HELP pdf_to_docx_peak_rss_bytes Пиковый объем резидентной памяти.",
+                "# TYPE pdf_to_docx_peak_rss_bytes gauge",
+                f'pdf_to_docx_peak_rss_bytes{{process="main"}} {report["peak_rss_bytes"]}',
+                f'pdf_to_docx_peak_rss_bytes{{process="children"}} {report["peak_rss_children_bytes"]}'
+            ])
+        return '\n'.join(lines) + '\n'
+def profile_stage(profiler, name, page=None, pixels=0):
+    if profiler is None:
+        return contextlib.nullcontext({})
+    return profiler.stage(name, page, pixels)
+def limit_cpu_threads(cpu_threads):
+    if not cpu_threads:
+        return
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(cpu_threads)
+class OCRProcessor:
+    def __init__(self, cpu_threads=None, trocr_lines=True, trocr_batch_size=16, collect_timings=False,
+                 preprocess=None, page_batch=1, paddle_batch_size=32, trocr_quantize=False, trocr_local_only=False):
+        self.cpu_threads = cpu_threads
+        self.collect_timings = collect_timings
+        self.page_timings = {}
+        self.preprocess = preprocess
+        self.page_batch = page_batch
+        self.paddle_batch_size = paddle_batch_size
+        self.page_upright = False
+        self.paddle_rejected_options = set()
+        self.trocr_lines = trocr_lines
+        self.trocr_batch_size = trocr_batch_size
+        self.trocr_quantize = trocr_quantize
+        self.trocr_local_only = trocr_local_only
+        self.trocr_stats = {'lines': 0, 'seconds': 0.0}
         self.models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
         os.makedirs(self.models_dir, exist_ok=True)
         self.paddle_ocr_initialized = False
@@ -168,6 +1388,7 @@ class OCRProcessor:
         self.paddle_ocr = None
         self.trocr_processor = None
         self.trocr_model = None
+        self.torch = None
     def init_paddle_ocr(self):
         if not PADDLE_OCR_AVAILABLE:
             raise Exception("PaddleOCR не установлен. Установите его с помощью: pip install paddleocr paddlepaddle")
@@ -178,11 +1399,11 @@ class OCRProcessor:
             os.makedirs(det_model_dir, exist_ok=True)
             os.makedirs(rec_model_dir, exist_ok=True)
             os.makedirs(cls_model_dir, exist_ok=True)
+            PaddleOCR = import_paddle_ocr()
             try:
                 print("Попытка инициализации PaddleOCR с указанными путями...")
                 self.paddle_ocr = PaddleOCR(
-                    use_angle_cls=True,
-                    lang='ru',
+                    **self.paddle_options(),
                     det_model_dir=det_model_dir,
                     rec_model_dir=rec_model_dir,
                     cls_model_dir=cls_model_dir
@@ -193,16 +1414,39 @@ class OCRProcessor:
                 print(f"Ошибка при инициализации PaddleOCR с указанными путями: {str(e)}")
                 print("Пробуем инициализировать PaddleOCR без указания путей...")
                 try:
-                    self.paddle_ocr = PaddleOCR(
-                        use_angle_cls=True,
-                        lang='ru'
-                    )
+                    self.paddle_ocr = PaddleOCR(**self.paddle_options())
                     self.paddle_ocr_initialized = True
                     print("PaddleOCR успешно инициализирован без указания путей")
                 except Exception as e:
                     error_msg = f"Ошибка при инициализации PaddleOCR: {str(e)}"
                     print(error_msg)
                     raise Exception(error_msg)
+    def options(self):
+        return {
+            'cpu_threads': self.cpu_threads,
+            'trocr_lines': self.trocr_lines,
+            'trocr_batch_size': self.trocr_batch_size,
+            'trocr_quantize': self.trocr_quantize,
+            'trocr_local_only': self.trocr_local_only,
+            'collect_timings': self.collect_timings,
+            'preprocess': self.preprocess,
+            'page_batch': self.page_batch,
+            'paddle_batch_size': self.paddle_batch_size
+        }
+    def cache_settings(self, ocr_engine):
+        settings = {'engine': ocr_engine, 'lang': 'ru'}
+        if ocr_engine == "TrOCR":
+            settings['trocr_lines'] = self.trocr_lines
+            if self.trocr_quantize:
+                settings['trocr_quantize'] = True
+        if self.preprocess is not None:
+            settings['preprocess'] = self.preprocess
+        return settings
+    def paddle_options(self):
+        options = {'use_angle_cls': True, 'lang': 'ru'}
+        if self.cpu_threads:
+            options['cpu_threads'] = self.cpu_threads
+        return options
     def init_trocr(self):
         if not TROCR_AVAILABLE:
             raise Exception("TrOCR не установлен. Установите его с помощью: pip install transformers")
@@ -212,63 +1456,188 @@ class OCRProcessor:
             os.environ['TRANSFORMERS_CACHE'] = cache_dir
             try:
                 print("Загрузка модели TrOCR...")
+                torch, TrOCRProcessor, VisionEncoderDecoderModel = import_trocr()
                 self.trocr_processor = TrOCRProcessor.from_pretrained(
                     'microsoft/trocr-base-handwritten',
-                    cache_dir=cache_dir
+                    cache_dir=cache_dir,
+                    local_files_only=self.trocr_local_only
                 )
                 self.trocr_model = VisionEncoderDecoderModel.from_pretrained(
                     'microsoft/trocr-base-handwritten',
-                    cache_dir=cache_dir
+                    cache_dir=cache_dir,
+                    local_files_only=self.trocr_local_only
                 )
+                self.trocr_model.eval()
                 if torch.cuda.is_available():
                     self.trocr_model = self.trocr_model.to('cuda')
+                elif self.trocr_quantize:
+                    self.trocr_model = quantize_linear_layers(torch, self.trocr_model)
+                if self.cpu_threads:
+                    torch.set_num_threads(self.cpu_threads)
+                self.torch = torch
                 self.trocr_initialized = True
                 print("Модель TrOCR успешно загружена")
             except Exception as e:
                 error_msg = f"Ошибка инициализации TrOCR: {str(e)}"
                 print(error_msg)
                 raise Exception(error_msg) 
-    def process_images(self, image_paths, progress_signal=None, ocr_engine="PaddleOCR"):
-        recognized_data = []
+    def get_process_func(self, ocr_engine="PaddleOCR"):
         try:
             if ocr_engine == "PaddleOCR":
                 self.init_paddle_ocr()
-                process_func = self._process_with_paddleocr
-            else:  
-                self.init_trocr()
-                process_func = self._process_with_trocr
-            total_images = len(image_paths)
-            for i, image_path in enumerate(image_paths):
-                try:
-                    page_data = process_func(image_path)
-                    recognized_data.append(page_data)
-                    if progress_signal:
-                        progress = 10 + int(70 * (i + 1) / total_images)
-                        progress_signal.emit(progress)
-                except Exception as e:
-                    error_msg = f"Ошибка при обработке изображения {image_path}: {str(e)}"
-                    print(error_msg)
-                    recognized_data.append({
-                        'image_path': image_path,
-                        'text_blocks': [{
-                            'text': f"ОШИБКА РАСПОЗНАВАНИЯ: {str(e)}",
-                            'confidence': 0.0,
-                            'coordinates': [[0, 0], [100, 0], [100, 100], [0, 100]],
-                            'type': 'text'
-                        }]
-                    })
-                    if progress_signal:
-                        progress = 10 + int(70 * (i + 1) / total_images)
-                        progress_signal.emit(progress)
+                return self._process_with_paddleocr
+            self.init_trocr()
+            return self._process_with_trocr
         except Exception as e:
             error_msg = f"Ошибка при инициализации OCR движка {ocr_engine}: {str(e)}"
             print(error_msg)
             raise Exception(error_msg)
+    @contextlib.contextmanager
+    def timed(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.page_timings[stage] = self.page_timings.get(stage, 0.0) + time.perf_counter() - started
+    def prepare_page(self, image):
+        self.page_upright = False
+        if self.preprocess is None:
+            return image, None
+        with self.timed('preprocess'):
+            image, transform = preprocess_page(image, **self.preprocess)
+        self.page_upright = transform['upright']
+        return image, transform
+    def failed_page(self, label, error):
+        error_msg = f"Ошибка при обработке изображения {label}: {str(error)}"
+        print(error_msg)
+        return {
+            'text_blocks': [TextBlock(f"ОШИБКА РАСПОЗНАВАНИЯ: {str(error)}", 0.0,
+                                      [[0, 0], [100, 0], [100, 100], [0, 100]])],
+            'error': str(error)
+        }
+    def recognize_page(self, process_func, image, label=None):
+        if label is None:
+            label = str(image) if isinstance(image, (str, os.PathLike)) else None
+        self.page_timings = {}
+        transform = None
+        try:
+            image, transform = self.prepare_page(image)
+            page_data = process_func(image)
+        except Exception as e:
+            page_data = self.failed_page(label, e)
+        return self.finish_page(page_data, label, transform)
+    def finish_page(self, page_data, label, transform=None):
+        page_data['text_blocks'] = PageBlocks.from_blocks(page_data['text_blocks'])
+        if transform is not None and 'error' not in page_data:
+            page_data['text_blocks'] = unmap_page_blocks(page_data['text_blocks'], transform)
+        page_data['image_path'] = label
+        if self.collect_timings:
+            page_data['timings'] = self.page_timings
+        return page_data
+    def process_images(self, images, progress_callback=None, ocr_engine="PaddleOCR", labels=None,
+                       cancel_token=None):
+        recognized_data = []
+        process_func = self.get_process_func(ocr_engine)
+        total_images = len(images)
+        step = max(1, self.page_batch)
+        for i in range(0, total_images, step):
+            batch = images[i:i + step]
+            if cancel_token:
+                try:
+                    cancel_token.check()
+                except ConversionCancelled as e:
+                    e.pages_done = len(recognized_data)
+                    e.recognized_data = recognized_data
+                    raise
+                cancel_token.start_page(len(batch))
+            batch_labels = labels[i:i + step] if labels else None
+            if step > 1:
+                recognized_data.extend(self.recognize_page_batch(process_func, batch, batch_labels))
+            else:
+                recognized_data.append(self.recognize_page(process_func, batch[0],
+                                                           batch_labels[0] if batch_labels else None))
+            if progress_callback:
+                progress = 10 + int(70 * len(recognized_data) / total_images)
+                progress_callback(progress)
+        return recognized_data
+    def supports_pooled_recognition(self, process_func):
+        return (process_func == self._process_with_paddleocr and
+                hasattr(self.paddle_ocr, 'text_detector') and hasattr(self.paddle_ocr, 'text_recognizer'))
+    def recognize_page_batch(self, process_func, images, labels=None):
+        labels = labels or [None] * len(images)
+        if not self.supports_pooled_recognition(process_func):
+            return [self.recognize_page(process_func, image, label) for image, label in zip(images, labels)]
+        pages = []
+        crops = []
+        for image, label in zip(images, labels):
+            if label is None:
+                label = str(image) if isinstance(image, (str, os.PathLike)) else None
+            self.page_timings = {}
+            page = {'label': label, 'timings': self.page_timings, 'transform': None, 'quads': None, 'error': None}
+            pages.append(page)
+            try:
+                image, page['transform'] = self.prepare_page(image)
+                with self.timed('detection'):
+                    quads = self.paddle_ocr.text_detector(to_bgr_array(image))[0]
+                    count = 0 if quads is None else len(quads)
+                    page['quads'] = quad_array(quads, count)
+                    rgb = load_rgb_image(image) if count else None
+                    page_crops = [to_bgr_array(quad_crop(rgb, quad)) for quad in page['quads']]
+                if page_crops and not self.page_upright and getattr(self.paddle_ocr, 'use_angle_cls', False):
+                    with self.timed('classification'):
+                        page_crops = self.paddle_ocr.text_classifier(page_crops)[0]
+                crops.extend((len(pages) - 1, index, crop) for index, crop in enumerate(page_crops))
+            except Exception as e:
+                page['error'] = e
+        order = sorted(range(len(crops)), key=lambda i: crops[i][2].shape[1] / crops[i][2].shape[0])
+        results = [None] * len(crops)
+        started = time.perf_counter()
+        for start in range(0, len(order), self.paddle_batch_size):
+            chunk = order[start:start + self.paddle_batch_size]
+            try:
+                recognized = self.paddle_ocr.text_recognizer([crops[i][2] for i in chunk])[0]
+            except Exception as e:
+                for i in chunk:
+                    pages[crops[i][0]]['error'] = pages[crops[i][0]]['error'] or e
+                continue
+            for i, (text, score) in zip(chunk, recognized):
+                results[i] = (text, float(score))
+        seconds_per_line = (time.perf_counter() - started) / max(1, len(crops))
+        drop_score = getattr(self.paddle_ocr, 'drop_score', 0.5)
+        lines = [[] for _ in pages]
+        for (page_idx, line_idx, _), result in zip(crops, results):
+            pages[page_idx]['timings']['recognition'] = (
+                pages[page_idx]['timings'].get('recognition', 0.0) + seconds_per_line
+            )
+            if result is not None and result[1] >= drop_score:
+                lines[page_idx].append((line_idx, result))
+        recognized_data = []
+        for page, page_lines in zip(pages, lines):
+            self.page_timings = page['timings']
+            if page['error'] is not None:
+                page_data = self.failed_page(page['label'], page['error'])
+            else:
+                page_data = {'text_blocks': paddle_page_blocks(
+                    [text for _, (text, _) in page_lines],
+                    page['quads'][[line_idx for line_idx, _ in page_lines]],
+                    [score for _, (_, score) in page_lines]
+                )}
+            recognized_data.append(self.finish_page(page_data, page['label'], page['transform']))
         return recognized_data
-    def _process_with_paddleocr(self, image_path):
-        result = self.paddle_ocr.ocr(image_path)
+    def run_paddle_ocr(self, image):
+        if self.page_upright:
+            for option in ('cls', 'use_textline_orientation'):
+                if option in self.paddle_rejected_options:
+                    continue
+                try:
+                    return self.paddle_ocr.ocr(image, **{option: False})
+                except TypeError:
+                    self.paddle_rejected_options.add(option)
+        return self.paddle_ocr.ocr(image)
+    def _process_with_paddleocr(self, image):
+        with self.timed('detection_recognition'):
+            result = self.run_paddle_ocr(to_bgr_array(image))
         page_data = {
-            'image_path': image_path,
             'text_blocks': []
         }
         try:
@@ -278,27 +1647,13 @@ class OCRProcessor:
                     texts = ocr_result.rec_texts
                     polys = ocr_result.rec_polys
                     scores = ocr_result.rec_scores if hasattr(ocr_result, 'rec_scores') else [0.9] * len(texts)
-                    for i, (text, poly, score) in enumerate(zip(texts, polys, scores)):
-                        text_block = {
-                            'text': text,
-                            'confidence': float(score),
-                            'coordinates': poly.tolist() if hasattr(poly, 'tolist') else poly,
-                            'type': 'header' if len(text) < 50 and float(score) > 0.9 else 'text'
-                        }
-                        page_data['text_blocks'].append(text_block)
+                    page_data['text_blocks'] = paddle_page_blocks(texts, polys, scores)
                 elif isinstance(ocr_result, dict):
                     if 'rec_texts' in ocr_result and 'rec_polys' in ocr_result:
                         texts = ocr_result['rec_texts']
                         polys = ocr_result['rec_polys']
                         scores = ocr_result.get('rec_scores', [0.9] * len(texts))
-                        for i, (text, poly, score) in enumerate(zip(texts, polys, scores)):
-                            text_block = {
-                                'text': text,
-                                'confidence': float(score),
-                                'coordinates': poly.tolist() if hasattr(poly, 'tolist') else poly,
-                                'type': 'header' if len(text) < 50 and float(score) > 0.9 else 'text'
-                            }
-                            page_data['text_blocks'].append(text_block)
+                        page_data['text_blocks'] = paddle_page_blocks(texts, polys, scores)
                 else:
                     for line in ocr_result:
                         if isinstance(line, tuple) and len(line) == 2:
@@ -315,300 +1670,1099 @@ class OCRProcessor:
                         else:
                             print(f"Неизвестный формат результата: {line}")
                             continue
-                        text_block = {
-                            'text': text,
-                            'confidence': float(confidence) if isinstance(confidence, (int, float)) else 0.9,
-                            'coordinates': coords,
-                            'type': 'header' if len(text) < 50 and float(confidence) > 0.9 else 'text'
-                        }
-                        page_data['text_blocks'].append(text_block)
+                        confidence = float(confidence) if isinstance(confidence, (int, float)) else 0.9
+                        page_data['text_blocks'].append(TextBlock(
+                            text, confidence, coords, 'header' if len(text) < 50 and confidence > 0.9 else 'text'
+                        ))
         except Exception as e:
             print(f"Ошибка при обработке результата PaddleOCR: {str(e)}")
-            page_data['text_blocks'].append({
-                'text': f"ОШИБКА РАСПОЗНАВАНИЯ: {str(e)}",
-                'confidence': 0.0,
-                'coordinates': [[0, 0], [100, 0], [100, 100], [0, 100]],
-                'type': 'text'
-            })
+            page_data['text_blocks'] = list(page_data['text_blocks']) + [
+                TextBlock(f"ОШИБКА РАСПОЗНАВАНИЯ: {str(e)}", 0.0, [[0, 0], [100, 0], [100, 100], [0, 100]])
+            ]
+        page_data['text_blocks'] = PageBlocks.from_blocks(page_data['text_blocks'])
+        return page_data
+    def _process_with_trocr(self, image):
+        image = load_rgb_image(image)
+        if self.trocr_lines:
+            return self._process_trocr_lines(image)
+        with self.timed('recognition'), self.trocr_inference():
+            pixel_values = self.trocr_processor(image, return_tensors="pt").pixel_values
+            if self.torch.cuda.is_available():
+                pixel_values = pixel_values.to('cuda')
+            generated_ids = self.trocr_model.generate(pixel_values)
+            generated_text = self.trocr_processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
+        page_data = {
+            'text_blocks': PageBlocks(
+                [generated_text], [[[0, 0], [image.width, 0], [image.width, image.height], [0, image.height]]], [0.9]
+            )
+        }
         return page_data
-    def _process_with_trocr(self, image_path):
-        image = Image.open(image_path).convert("RGB")
-        pixel_values = self.trocr_processor(image, return_tensors="pt").pixel_values
-        if torch.cuda.is_available():
-            pixel_values = pixel_values.to('cuda')
-        generated_ids = self.trocr_model.generate(pixel_values)
-        generated_text = self.trocr_processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
+    def _process_trocr_lines(self, image):
+        with self.timed('detection'):
+            boxes = segment_text_lines(image) or [(0, 0, image.width, image.height)]
+        with self.timed('recognition'):
+            texts = self.recognize_trocr_lines([image.crop(box) for box in boxes])
+        kept = [(box, text) for box, text in zip(boxes, texts) if text.strip()]
         page_data = {
-            'image_path': image_path,
-            'text_blocks': [{
-                'text': generated_text,
-                'confidence': 0.9,  
-                'coordinates': [[0, 0], [image.width, 0], [image.width, image.height], [0, image.height]],
-                'type': 'text'
-            }]
+            'text_blocks': PageBlocks(
+                [text for _, text in kept],
+                [[[x0, y0], [x1, y0], [x1, y1], [x0, y1]] for (x0, y0, x1, y1), _ in kept],
+                [0.9] * len(kept)
+            )
         }
         return page_data
+    def trocr_inference(self):
+        inference_mode = getattr(self.torch, 'inference_mode', None)
+        return inference_mode() if inference_mode else self.torch.no_grad()
+    def recognize_trocr_lines(self, line_images):
+        started = time.perf_counter()
+        texts = [''] * len(line_images)
+        order = sorted(range(len(line_images)), key=lambda i: line_images[i].width)
+        batch = []
+        for i in order + [None]:
+            if batch and (i is None or len(batch) >= self.trocr_batch_size
+                          or line_images[i].width > 1.5 * line_images[batch[0]].width):
+                pixel_values = self.trocr_processor(
+                    images=[line_images[j] for j in batch], return_tensors="pt"
+                ).pixel_values
+                if self.torch.cuda.is_available():
+                    pixel_values = pixel_values.to('cuda')
+                with self.trocr_inference():
+                    generated_ids = self.trocr_model.generate(pixel_values)
+                decoded = self.trocr_processor.batch_decode(generated_ids, skip_special_tokens=True)
+                for j, text in zip(batch, decoded):
+                    texts[j] = text
+                batch = []
+            if i is not None:
+                batch.append(i)
+        self.trocr_stats['lines'] += len(line_images)
+        self.trocr_stats['seconds'] += time.perf_counter() - started
+        return texts
     def analyze_document_structure(self, recognized_data):
         document_structure = {
             'pages': []
         }
         for page_idx, page_data in enumerate(recognized_data):
-            page_structure = {
-                'page_number': page_idx + 1,
-                'elements': []
-            }
-            text_blocks = sorted(page_data['text_blocks'], 
-                                key=lambda block: block['coordinates'][0][1])
-            for block in text_blocks:
-                element_type = self._determine_element_type(block)
-                element = {
-                    'type': element_type,
-                    'text': block['text'],
-                    'coordinates': block['coordinates']
-                }
-                page_structure['elements'].append(element)
-            document_structure['pages'].append(page_structure)
+            elements = layout_page_elements(page_data['text_blocks'], merge_lines=not page_data.get('text_layer'))
+            document_structure['pages'].append(page_structure(page_data, elements, page_idx + 1))
         return document_structure
-    def _determine_element_type(self, text_block):
-        text = text_block['text']
-        if len(text) < 50 and text.strip().isupper():
-            return 'heading1'
-        elif len(text) < 100 and text.strip().endswith(':'):
-            return 'heading2'
-        if text.strip().startswith(('•', '-', '*', '1.', '2.', '3.')):
-            return 'list_item'
-        return 'paragraph' 
-class ProcessingThread(QThread):
-    progress_signal = pyqtSignal(int)
-    finished_signal = pyqtSignal(str)
-    error_signal = pyqtSignal(str)
-    def __init__(self, ocr_processor, file_paths, output_path, ocr_engine):
-        super().__init__()
-        self.ocr_processor = ocr_processor
-        self.file_paths = file_paths
-        self.output_path = output_path
-        self.ocr_engine = ocr_engine
-    def run(self):
+def prefetch(iterable, depth=2):
+    buffer = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+    def put(entry):
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    def produce():
+        try:
+            for item in iterable:
+                if not put(('item', item)):
+                    return
+            put(('done', None))
+        except BaseException as e:
+            put(('error', e))
+        finally:
+            close = getattr(iterable, 'close', None)
+            if close:
+                close()
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            kind, value = buffer.get()
+            if kind == 'item':
+                yield value
+            elif kind == 'error':
+                raise value
+            else:
+                return
+    finally:
+        stop.set()
+        thread.join()
+def image_digest(image):
+    digest = hashlib.sha256()
+    if isinstance(image, (str, os.PathLike)):
+        with open(image, 'rb') as image_file:
+            for chunk in iter(lambda: image_file.read(1 << 20), b''):
+                digest.update(chunk)
+    elif isinstance(image, Image.Image):
+        digest.update(f"{image.mode}:{image.size}".encode())
+        digest.update(image.tobytes())
+    else:
+        image = np.ascontiguousarray(image)
+        digest.update(f"{image.dtype}:{image.shape}".encode())
+        digest.update(memoryview(image).cast('B'))
+    return digest.hexdigest()
+class OCRCache:
+    def __init__(self, path=None, max_bytes=512 * 1024 * 1024):
+        if path is None:
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "ocr_cache.sqlite")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self.connection.commit()
+    @staticmethod
+    def make_key(image, settings, dpi=None):
+        payload = json.dumps(dict(settings, dpi=dpi), sort_keys=True)
+        return hashlib.sha256(f"{image_digest(image)}:{payload}".encode()).hexdigest()
+    def get(self, key):
+        with self.lock:
+            row = self.connection.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.connection.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.connection.commit()
+        return PageBlocks.from_blocks(json.loads(row[0]))
+    def put(self, key, text_blocks):
+        value = json.dumps(PageBlocks.from_blocks(text_blocks).to_dicts(), ensure_ascii=False).encode('utf-8')
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time())
+            )
+            self._evict()
+            self.connection.commit()
+    def _evict(self):
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale_keys = []
+        for key, size in self.connection.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            total -= size
+        self.connection.executemany("DELETE FROM entries WHERE key = ?", stale_keys)
+        self.evictions += len(stale_keys)
+    def stats(self):
+        with self.lock:
+            entries, size = self.connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes
+        }
+    def close(self):
+        with self.lock:
+            self.connection.close()
+def recognize_input_pages(pages, ocr_processor, engine="PaddleOCR", cache=None, profiler=None):
+    process_func = None
+    pending = []
+    for item in pages:
+        if item['text_blocks'] is not None:
+            if pending:
+                pending.append((item, {'text_blocks': item['text_blocks']}, None))
+            else:
+                yield page_result(item, {'text_blocks': item['text_blocks']})
+            continue
+        image = item['image']
+        cached_blocks = None
+        cache_key = None
+        if cache:
+            with profile_stage(profiler, 'cache_lookup', item['image_path']):
+                cache_key = cache.make_key(image, ocr_processor.cache_settings(engine), item['dpi'])
+                cached_blocks = cache.get(cache_key)
+        if cached_blocks is not None:
+            if pending:
+                pending.append((item, {'text_blocks': cached_blocks}, None))
+            else:
+                yield page_result(item, {'text_blocks': cached_blocks})
+            continue
+        if process_func is None:
+            with profile_stage(profiler, 'model_init'):
+                process_func = ocr_processor.get_process_func(engine)
+        if ocr_processor.page_batch > 1:
+            pending.append((item, None, cache_key))
+            if sum(page_data is None for _, page_data, _ in pending) >= ocr_processor.page_batch:
+                yield from recognize_pending_pages(pending, ocr_processor, process_func, cache)
+                pending = []
+            continue
+        page_data = ocr_processor.recognize_page(process_func, image, item['image_path'])
+        if cache and 'error' not in page_data:
+            cache.put(cache_key, page_data['text_blocks'])
+        yield page_result(item, page_data)
+    yield from recognize_pending_pages(pending, ocr_processor, process_func, cache)
+def recognize_pending_pages(pending, ocr_processor, process_func, cache=None):
+    batch = [item for item, page_data, _ in pending if page_data is None]
+    if batch:
+        results = iter(ocr_processor.recognize_page_batch(
+            process_func, [item['image'] for item in batch], [item['image_path'] for item in batch]
+        ))
+    for item, page_data, cache_key in pending:
+        if page_data is None:
+            page_data = next(results)
+            if cache and 'error' not in page_data:
+                cache.put(cache_key, page_data['text_blocks'])
+        yield page_result(item, page_data)
+_worker_state = None
+def init_ocr_worker(engine, ocr_options):
+    global _worker_state
+    limit_cpu_threads(ocr_options.get('cpu_threads'))
+    processor = OCRProcessor(**ocr_options)
+    try:
+        _worker_state = (processor, processor.get_process_func(engine), None)
+    except Exception as e:
+        _worker_state = (processor, None, e)
+def ocr_worker_recognize(image, label):
+    processor, process_func, error = _worker_state
+    if error is not None:
+        raise error
+    return processor.recognize_page(process_func, image, label)
+def recognize_input_pages_parallel(pages, ocr_processor, engine="PaddleOCR", workers=2, cache=None,
+                                   window=None):
+    window = window or workers * 2
+    pending = collections.deque()
+    def finish(entry):
+        item, future, page_data, cache_key = entry
+        if future is None:
+            return page_result(item, page_data)
+        page_data = future.result()
+        if cache and 'error' not in page_data:
+            cache.put(cache_key, page_data['text_blocks'])
+        return page_result(item, page_data)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_ocr_worker,
+        initargs=(engine, ocr_processor.options())
+    ) as executor:
         try:
-            all_images = []
-            for file_path in self.file_paths:
-                ext = get_file_extension(file_path)
-                if ext.lower() == 'pdf':
-                    pdf_images = convert_pdf_to_images(file_path)
-                    all_images.extend(pdf_images)
-                    self.progress_signal.emit(10)
+            for item in pages:
+                text_blocks = item['text_blocks']
+                cache_key = None
+                if text_blocks is None and cache:
+                    cache_key = cache.make_key(item['image'], ocr_processor.cache_settings(engine), item['dpi'])
+                    text_blocks = cache.get(cache_key)
+                if text_blocks is not None:
+                    pending.append((item, None, {'text_blocks': text_blocks}, None))
                 else:
-                    all_images.append(file_path)
-                    self.progress_signal.emit(10)
-            recognized_data = self.ocr_processor.process_images(
-                all_images, 
-                self.progress_signal,
-                self.ocr_engine
+                    future = executor.submit(ocr_worker_recognize, item['image'], item['image_path'])
+                    item['image'] = None
+                    pending.append((item, future, None, cache_key))
+                while len(pending) >= window:
+                    yield finish(pending.popleft())
+            while pending:
+                yield finish(pending.popleft())
+        finally:
+            for _, future, _, _ in pending:
+                if future:
+                    future.cancel()
+def iter_recognized_pages(paths, ocr_processor, engine="PaddleOCR", text_layer=True, queue_depth=2,
+                          workers=1, cache=None, dpi=300, embed_images=True, profiler=None, checkpoint=None,
+                          manifest=None, checkpoint_file=None, settings=None):
+    pages = prefetch(iter_input_pages(paths, text_layer, dpi, embed_images, profiler, checkpoint, manifest),
+                     queue_depth)
+    if workers > 1:
+        recognized = recognize_input_pages_parallel(pages, ocr_processor, engine, workers, cache)
+    else:
+        recognized = recognize_input_pages(pages, ocr_processor, engine, cache, profiler)
+    if checkpoint_file:
+        recognized = checkpoint_pages(recognized, checkpoint_file, engine, settings)
+    return prefetch(recognized, queue_depth)
+def convert(paths, output, engine="PaddleOCR", ocr_processor=None, progress_callback=None,
+            text_layer=True, queue_depth=2, workers=1, cpu_threads=None, cache=None, dpi=300,
+            embed_images=True, profiler=None, streaming_docx=False, cancel_token=None, checkpoint_path=None,
+            partial_output=True, manifest_path=None, workspace=None, structured_output=None,
+            structured_format=None):
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    if engine not in OCR_ENGINES:
+        raise ValueError(f"Неизвестный OCR движок: {engine}. Доступны: {', '.join(OCR_ENGINES)}")
+    if ocr_processor is None:
+        ocr_processor = OCRProcessor(cpu_threads=cpu_threads)
+    if profiler:
+        ocr_processor.collect_timings = True
+    if progress_callback:
+        progress_callback(10)
+    total_pages = max(1, count_input_pages(paths))
+    if cancel_token:
+        cancel_token.check()
+    settings = manifest_settings(ocr_processor, engine, text_layer, dpi)
+    checkpoint = read_ocr_checkpoint(checkpoint_path, settings_digest(settings)) if checkpoint_path else None
+    manifest = None
+    if manifest_path:
+        manifest = PageManifest(manifest_path, settings)
+    checkpoint_file = open(checkpoint_path, 'a', encoding='utf-8') if checkpoint_path else None
+    builder = StreamingDocxBuilder(output, profiler, workspace=workspace) if streaming_docx else DocxBuilder(profiler)
+    structured = open_structured_output(structured_output, structured_format) if structured_output else None
+    pages = iter_recognized_pages(paths, ocr_processor, engine, text_layer, queue_depth, workers,
+                                  cache, dpi, embed_images, profiler, checkpoint, manifest,
+                                  checkpoint_file, settings_digest(settings))
+    try:
+        if cancel_token:
+            cancel_token.start_page(ocr_processor.page_batch)
+        for page_number, page_data in enumerate(pages, 1):
+            if profiler:
+                profiler.record_page_timings(page_data)
+            elements = builder.add_page(page_data)
+            if structured:
+                structured.add_page(page_data, elements)
+            if manifest:
+                manifest.add(page_data)
+            if progress_callback:
+                progress_callback(10 + int(70 * page_number / total_pages))
+            if cancel_token and page_number < total_pages:
+                cancel_token.check()
+                cancel_token.start_page(ocr_processor.page_batch)
+        if progress_callback:
+            progress_callback(80)
+        docx_path = builder.save(output)
+        if structured:
+            structured.save()
+        if manifest:
+            manifest.commit()
+        if checkpoint_file:
+            checkpoint_file.close()
+            os.remove(checkpoint_path)
+    except ConversionCancelled as e:
+        pages.close()
+        e.pages_done = builder.pages_added
+        if partial_output and builder.pages_added:
+            e.partial_path = builder.save(output)
+            if structured:
+                structured.save()
+        raise
+    finally:
+        pages.close()
+        builder.close()
+        if structured:
+            structured.close()
+        if manifest:
+            manifest.close()
+        if checkpoint_file:
+            checkpoint_file.close()
+    if progress_callback:
+        progress_callback(100)
+    return docx_path
+class AsyncConversionJob:
+    def __init__(self, job_id, paths, output, engine, cancel_token=None, progress_callback=None):
+        self.id = job_id
+        self.paths = paths
+        self.output = output
+        self.engine = engine
+        self.cancel_token = cancel_token or CancellationToken()
+        self.progress_callback = progress_callback
+        self.pages_total = 0
+        self.pages_done = 0
+        self.failure = None
+        self.queue = asyncio.Queue()
+        self.result = asyncio.get_running_loop().create_future()
+    def cancel(self, reason="отменено пользователем"):
+        self.cancel_token.cancel(reason)
+    def emit(self, event, **fields):
+        progress = 10 + int(70 * self.pages_done / max(1, self.pages_total))
+        if event == 'saving':
+            progress = 80
+        elif event == 'finished':
+            progress = 100
+        record = dict(fields, job=self.id, event=event, pages_done=self.pages_done,
+                      pages_total=self.pages_total, progress=progress)
+        self.queue.put_nowait(record)
+        if self.progress_callback:
+            self.progress_callback(record)
+    async def events(self):
+        while True:
+            record = await self.queue.get()
+            yield record
+            if record['event'] in ('finished', 'failed', 'cancelled'):
+                return
+    async def wait(self):
+        return await self.result
+class AsyncConverter:
+    def __init__(self, ocr_processor=None, engine="PaddleOCR", max_jobs=4, max_pages_in_flight=8, io_workers=4,
+                 ocr_workers=1, queue_depth=2, text_layer=True, dpi=300, embed_images=True, cache=None,
+                 streaming_docx=False, incremental=False, temp_root=None, temp_limit=None, structured_format=None):
+        if engine not in OCR_ENGINES:
+            raise ValueError(f"Неизвестный OCR движок: {engine}. Доступны: {', '.join(OCR_ENGINES)}")
+        self.ocr_processor = ocr_processor or OCRProcessor()
+        self.engine = engine
+        self.queue_depth = queue_depth
+        self.text_layer = text_layer
+        self.dpi = dpi
+        self.embed_images = embed_images
+        self.cache = cache
+        self.streaming_docx = streaming_docx
+        self.incremental = incremental
+        self.structured_format = structured_format
+        self.temp_root = temp_root
+        self.temp_limit = temp_limit
+        self.ocr_workers = ocr_workers
+        self.job_slots = asyncio.Semaphore(max_jobs)
+        self.page_slots = asyncio.Semaphore(max_pages_in_flight)
+        self.io_executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="pdf_to_docx_io")
+        self.pdf_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf_to_docx_pdf")
+        if ocr_workers > 1:
+            self.ocr_executor = ProcessPoolExecutor(
+                max_workers=ocr_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_ocr_worker,
+                initargs=(engine, self.ocr_processor.options())
             )
-            self.progress_signal.emit(80)
-            docx_path = save_docx_file(recognized_data, self.output_path)
-            self.progress_signal.emit(100)
-            self.finished_signal.emit(docx_path)
-        except Exception as e:
-            self.error_signal.emit(f"Ошибка при обработке: {str(e)}")
-class DropArea(QWidget):
-    def __init__(self, parent):
-        super().__init__()
-        self.parent = parent
-        self.setAcceptDrops(True)
-        self.setMinimumHeight(200)
-        self.setStyleSheet("border: 2px dashed #cccccc; border-radius: 5px;")
-        layout = QVBoxLayout(self)
-        icon_label = QLabel()
-        icon = parent.style().standardIcon(parent.style().StandardPixmap.SP_FileIcon)
-        icon_label.setPixmap(icon.pixmap(64, 64))
-        icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        icon_label.setStyleSheet("border: none;")
-        layout.addWidget(icon_label)
-        self.label = QLabel("Перетащите файлы сюда")
-        self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.label.setStyleSheet("border: none;")
-        layout.addWidget(self.label)
-    def dragEnterEvent(self, event: QDragEnterEvent):
-        if event.mimeData().hasUrls():
-            event.acceptProposedAction()
-            self.setStyleSheet("background-color: #e0f7fa; border: 2px dashed #00acc1; border-radius: 5px;")
-    def dragLeaveEvent(self, event):
-        self.setStyleSheet("border: 2px dashed #cccccc; border-radius: 5px;")
-    def dropEvent(self, event: QDropEvent):
-        self.setStyleSheet("border: 2px dashed #cccccc; border-radius: 5px;")
-        file_paths = []
-        mime_data: QMimeData = event.mimeData()
-        if mime_data.hasUrls():
-            for url in mime_data.urls():
-                file_path = url.toLocalFile()
-                ext = get_file_extension(file_path)
-                if ext.lower() in ['pdf', 'jpg', 'jpeg', 'png', 'bmp']:
-                    file_paths.append(file_path)
-        if file_paths:
-            self.parent.file_paths = file_paths
-            self.parent.update_convert_button()
-            self.label.setText(f"Выбрано файлов: {len(file_paths)}")
-        event.acceptProposedAction()
-class MainWindow(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.ocr_processor = OCRProcessor()
-        self.file_paths = []
-        self.output_path = ""
-        self.init_ui()
-    def closeEvent(self, event):
-        clean_temp_files()
-        event.accept()
-    def init_ui(self):
-        self.setWindowTitle("PDF/Изображение в DOCX")
-        self.setMinimumSize(600, 400)
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-        main_layout = QVBoxLayout(central_widget)
-        boxes_layout = QHBoxLayout()
-        self.input_box = QGroupBox("Выберите файл")
-        input_layout = QVBoxLayout()
-        self.input_box.setLayout(input_layout)
-        self.drop_area = DropArea(self)
-        self.drop_area.setMinimumSize(200, 200)
-        input_layout.addWidget(self.drop_area)
-        self.select_file_btn = QPushButton("Выбрать файл")
-        self.select_file_btn.setIcon(self.style().standardIcon(self.style().StandardPixmap.SP_DialogOpenButton))
-        self.select_file_btn.clicked.connect(self.select_files)
-        input_layout.addWidget(self.select_file_btn)
-        self.output_box = QGroupBox("Выберите путь сохранения")
-        output_layout = QVBoxLayout()
-        self.output_box.setLayout(output_layout)
-        icon_label = QLabel()
-        icon = self.style().standardIcon(self.style().StandardPixmap.SP_FileDialogNewFolder)
-        icon_label.setPixmap(icon.pixmap(64, 64))
-        icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        output_layout.addWidget(icon_label)
-        self.output_path_label = QLabel("Путь не выбран")
-        self.output_path_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.output_path_label.setWordWrap(True)
-        output_layout.addWidget(self.output_path_label)
-        self.select_output_btn = QPushButton("Выбрать путь")
-        self.select_output_btn.setIcon(self.style().standardIcon(self.style().StandardPixmap.SP_DialogSaveButton))
-        self.select_output_btn.clicked.connect(self.select_output_path)
-        output_layout.addWidget(self.select_output_btn)
-        boxes_layout.addWidget(self.input_box)
-        boxes_layout.addWidget(self.output_box)
-        main_layout.addLayout(boxes_layout)
-        self.ocr_engine_combo = QComboBox()
-        if PADDLE_OCR_AVAILABLE:
-            self.ocr_engine_combo.addItem("PaddleOCR")
-        if TROCR_AVAILABLE:
-            self.ocr_engine_combo.addItem("TrOCR")
-        self.ocr_engine_combo.hide()  
-        self.convert_btn = QPushButton("Конвертировать")
-        self.convert_btn.setEnabled(False)
-        self.convert_btn.clicked.connect(self.process_files)
-        self.convert_btn.setMinimumHeight(50)  
-        self.convert_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #2196F3;
-                color: white;
-                font-size: 16px;
-                font-weight: bold;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #0D47A1;
-            }
-            QPushButton:disabled {
-                background-color: #BDBDBD;
-            }
-        """)
-        main_layout.addWidget(self.convert_btn)
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setRange(0, 100)
-        self.progress_bar.setValue(0)
-        main_layout.addWidget(self.progress_bar)
-        self.progress_bar.hide()  
-        self.status_label = QLabel()
-        main_layout.addWidget(self.status_label)
-        self.status_label.hide()  
-    def select_files(self):
-        file_dialog = QFileDialog()
-        file_paths, _ = file_dialog.getOpenFileNames(
-            self,
-            "Выберите файлы",
-            "",
-            "Все поддерживаемые форматы (*.pdf *.jpg *.jpeg *.png *.bmp);;PDF файлы (*.pdf);;Изображения (*.jpg *.jpeg *.png *.bmp)"
-        )
-        if file_paths:
-            self.file_paths = file_paths
-            self.drop_area.label.setText(f"Выбрано файлов: {len(file_paths)}")
-            self.update_convert_button()
-    def select_output_path(self):
-        output_path, _ = QFileDialog.getSaveFileName(
-            self,
-            "Сохранить DOCX файл",
-            "",
-            "DOCX файлы (*.docx)"
-        )
-        if output_path:
-            if not output_path.endswith('.docx'):
-                output_path += '.docx'
-            self.output_path = output_path
-            path_parts = os.path.split(output_path)
-            display_path = f".../{path_parts[1]}"
-            self.output_path_label.setText(display_path)
-            self.update_convert_button()
-    def update_convert_button(self):
-        self.convert_btn.setEnabled(bool(self.file_paths) and bool(self.output_path))
-    def process_files(self):
-        if not self.file_paths or not self.output_path:
-            QMessageBox.warning(self, "Предупреждение", "Выберите файлы и путь сохранения")
+        else:
+            self.ocr_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf_to_docx_ocr")
+        self.jobs_created = 0
+        self.tasks = set()
+    async def __aenter__(self):
+        return self
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    async def close(self):
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.io_executor.shutdown(wait=True)
+        self.pdf_executor.shutdown(wait=True)
+        self.ocr_executor.shutdown(wait=True)
+    async def submit(self, paths, output, engine=None, cancel_token=None, progress_callback=None):
+        if isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+        engine = engine or self.engine
+        if engine not in OCR_ENGINES:
+            raise ValueError(f"Неизвестный OCR движок: {engine}. Доступны: {', '.join(OCR_ENGINES)}")
+        if self.ocr_workers > 1 and engine != self.engine:
+            raise ValueError(f"Процессы OCR запущены с движком {self.engine}")
+        self.jobs_created += 1
+        job = AsyncConversionJob(self.jobs_created, list(paths), output, engine, cancel_token, progress_callback)
+        job.emit('queued')
+        task = asyncio.ensure_future(self._run(job))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return job
+    async def convert(self, paths, output, **job_options):
+        job = await self.submit(paths, output, **job_options)
+        return await job.wait()
+    async def _recognize(self, job, item):
+        loop = asyncio.get_running_loop()
+        if item['text_blocks'] is not None:
+            return page_result(item, {'text_blocks': item['text_blocks']})
+        if self.ocr_workers <= 1:
+            def recognize():
+                return next(recognize_input_pages(iter([item]), self.ocr_processor, job.engine, self.cache))
+            return await loop.run_in_executor(self.ocr_executor, recognize)
+        cache_key = None
+        if self.cache:
+            def lookup():
+                key = self.cache.make_key(item['image'], self.ocr_processor.cache_settings(job.engine), item['dpi'])
+                return key, self.cache.get(key)
+            cache_key, text_blocks = await loop.run_in_executor(self.io_executor, lookup)
+            if text_blocks is not None:
+                return page_result(item, {'text_blocks': text_blocks})
+        page_data = await loop.run_in_executor(self.ocr_executor, ocr_worker_recognize, item['image'], item['image_path'])
+        if cache_key and 'error' not in page_data:
+            await loop.run_in_executor(self.io_executor, self.cache.put, cache_key, page_data['text_blocks'])
+        return page_result(item, page_data)
+    def _fail(self, job, error):
+        if job.failure is None:
+            job.failure = error
+        if not job.cancel_token.is_cancelled():
+            job.cancel_token.cancel("ошибка в задании")
+    async def _run(self, job):
+        loop = asyncio.get_running_loop()
+        async with self.job_slots:
+            workspace = None
+            builder = None
+            structured = None
+            try:
+                job.pages_total = await loop.run_in_executor(self.pdf_executor, count_input_pages, job.paths)
+                manifest = None
+                if self.incremental:
+                    settings = manifest_settings(self.ocr_processor, job.engine, self.text_layer, self.dpi)
+                    manifest = await loop.run_in_executor(self.io_executor, PageManifest,
+                                                          manifest_path_for(job.output), settings)
+                if self.streaming_docx:
+                    workspace = await loop.run_in_executor(self.io_executor, Workspace, self.temp_root, self.temp_limit)
+                    builder = await loop.run_in_executor(
+                        self.io_executor, functools.partial(StreamingDocxBuilder, job.output, workspace=workspace)
+                    )
+                else:
+                    builder = await loop.run_in_executor(self.io_executor, DocxBuilder)
+                if self.structured_format:
+                    structured = await loop.run_in_executor(
+                        self.io_executor, open_structured_output,
+                        structured_path_for(job.output, self.structured_format), self.structured_format
+                    )
+            except Exception as e:
+                if builder:
+                    builder.close()
+                if workspace:
+                    workspace.close()
+                job.emit('failed', error=str(e))
+                job.result.set_exception(e)
+                return
+            job.emit('started')
+            pages = iter_input_pages(job.paths, self.text_layer, self.dpi, self.embed_images, manifest=manifest)
+            rasterized = asyncio.Queue(maxsize=self.queue_depth)
+            recognized = asyncio.Queue(maxsize=self.queue_depth)
+            async def rasterize():
+                try:
+                    while True:
+                        job.cancel_token.check()
+                        await self.page_slots.acquire()
+                        try:
+                            item = await loop.run_in_executor(self.pdf_executor, next, pages, None)
+                        except BaseException:
+                            self.page_slots.release()
+                            raise
+                        if item is None:
+                            self.page_slots.release()
+                            return
+                        job.emit('rasterized', page=item['image_path'])
+                        await rasterized.put(item)
+                except Exception as e:
+                    self._fail(job, e)
+                finally:
+                    await loop.run_in_executor(self.pdf_executor, pages.close)
+                    await rasterized.put(None)
+            async def recognize():
+                while True:
+                    item = await rasterized.get()
+                    if item is None:
+                        break
+                    try:
+                        if job.failure is None:
+                            job.cancel_token.check()
+                            page_data = await self._recognize(job, item)
+                            job.emit('recognized', page=item['image_path'])
+                            await recognized.put(page_data)
+                    except Exception as e:
+                        self._fail(job, e)
+                    finally:
+                        self.page_slots.release()
+                await recognized.put(None)
+            async def write():
+                while True:
+                    page_data = await recognized.get()
+                    if page_data is None:
+                        return
+                    if job.failure is not None:
+                        continue
+                    try:
+                        job.cancel_token.check()
+                        elements = await loop.run_in_executor(self.io_executor, builder.add_page, page_data)
+                        if structured:
+                            await loop.run_in_executor(self.io_executor, structured.add_page, page_data, elements)
+                        if manifest:
+                            await loop.run_in_executor(self.io_executor, manifest.add, page_data)
+                    except Exception as e:
+                        self._fail(job, e)
+                        continue
+                    job.pages_done += 1
+                    job.cancel_token.start_page()
+                    job.emit('page', page=page_data['image_path'])
+            job.cancel_token.start_page()
+            await asyncio.gather(rasterize(), recognize(), write())
+            try:
+                if job.failure is None:
+                    job.emit('saving')
+                    result = await loop.run_in_executor(self.io_executor, builder.save, job.output)
+                    if structured:
+                        await loop.run_in_executor(self.io_executor, structured.save)
+                    if manifest:
+                        await loop.run_in_executor(self.io_executor, manifest.commit)
+                    job.emit('finished', output=result)
+                    job.result.set_result(result)
+                elif isinstance(job.failure, ConversionCancelled):
+                    job.failure.pages_done = builder.pages_added
+                    if builder.pages_added:
+                        job.failure.partial_path = await loop.run_in_executor(self.io_executor, builder.save, job.output)
+                        if structured:
+                            await loop.run_in_executor(self.io_executor, structured.save)
+                    job.emit('cancelled', error=str(job.failure), partial_path=job.failure.partial_path)
+                    job.result.set_exception(job.failure)
+                else:
+                    job.emit('failed', error=str(job.failure))
+                    job.result.set_exception(job.failure)
+            except Exception as e:
+                job.emit('failed', error=str(e))
+                job.result.set_exception(e)
+            finally:
+                await loop.run_in_executor(self.io_executor, builder.close)
+                if structured:
+                    await loop.run_in_executor(self.io_executor, structured.close)
+                if workspace:
+                    await loop.run_in_executor(self.io_executor, workspace.close)
+                if manifest:
+                    await loop.run_in_executor(self.io_executor, manifest.close)
+class ConversionJob:
+    def __init__(self, data, suffix, engine, page_timeout=None):
+        self.data = data
+        self.suffix = suffix
+        self.engine = engine
+        self.cancel_token = CancellationToken(page_budget=page_timeout)
+        self.cancelled = False
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.queued_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+class ConversionService:
+    def __init__(self, ocr_processor=None, max_queue=16, job_timeout=None, page_timeout=None, temp_root=None,
+                 temp_limit=None, **convert_options):
+        self.ocr_processor = ocr_processor or OCRProcessor()
+        self.convert_options = convert_options
+        self.job_timeout = job_timeout
+        self.page_timeout = page_timeout
+        self.temp_root = temp_root
+        self.temp_limit = temp_limit
+        self.jobs = queue.Queue(maxsize=max_queue)
+        self.processed = 0
+        self.failed = 0
+        self.worker = threading.Thread(target=self._work, daemon=True)
+    def preload(self, engines):
+        for engine in engines:
+            started = time.perf_counter()
+            self.ocr_processor.get_process_func(engine)
+            print(f"Модель {engine} загружена за {time.perf_counter() - started:.1f} с")
+    def start(self):
+        self.worker.start()
+    def stop(self):
+        self.jobs.put(None)
+        self.worker.join()
+    def submit(self, data, suffix=".pdf", engine="PaddleOCR"):
+        if engine not in OCR_ENGINES:
+            raise ValueError(f"Неизвестный OCR движок: {engine}. Доступны: {', '.join(OCR_ENGINES)}")
+        job = ConversionJob(data, suffix, engine, self.page_timeout)
+        self.jobs.put_nowait(job)
+        return job
+    def _work(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            job.started_at = time.perf_counter()
+            if self.job_timeout:
+                job.cancel_token.deadline = time.monotonic() + self.job_timeout
+            try:
+                with Workspace(self.temp_root, self.temp_limit) as workspace:
+                    input_path = workspace.write("input" + job.suffix, job.data)
+                    output = io.BytesIO()
+                    convert([input_path], output, engine=job.engine, ocr_processor=self.ocr_processor,
+                            cancel_token=job.cancel_token, partial_output=False, workspace=workspace,
+                            **self.convert_options)
+                    job.result = output.getvalue()
+                self.processed += 1
+            except ConversionCancelled as e:
+                job.error = str(e)
+                job.cancelled = True
+                self.failed += 1
+            except Exception as e:
+                job.error = str(e)
+                self.failed += 1
+            finally:
+                job.data = None
+                job.finished_at = time.perf_counter()
+                job.done.set()
+    def status(self):
+        return {
+            'status': 'ok',
+            'queued': self.jobs.qsize(),
+            'processed': self.processed,
+            'failed': self.failed
+        }
+def make_request_handler(service, job_timeout=3600):
+    class ConversionRequestHandler(BaseHTTPRequestHandler):
+        def send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        def do_GET(self):
+            if urlparse(self.path).path == "/health":
+                self.send_json(200, service.status())
+            else:
+                self.send_json(404, {'error': "Неизвестный адрес"})
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != "/convert":
+                self.send_json(404, {'error': "Неизвестный адрес"})
+                return
+            params = parse_qs(url.query)
+            engine = params.get('engine', ["PaddleOCR"])[0]
+            ext = get_file_extension(params.get('filename', ["input.pdf"])[0]).lower() or "pdf"
+            data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not data:
+                self.send_json(400, {'error': "Пустое тело запроса"})
+                return
+            if service.temp_limit is not None and len(data) > service.temp_limit:
+                self.send_json(413, {'error': "Файл больше лимита временных файлов задания"})
+                return
+            try:
+                job = service.submit(data, "." + ext, engine)
+            except ValueError as e:
+                self.send_json(400, {'error': str(e)})
+                return
+            except queue.Full:
+                self.send_json(503, {'error': "Очередь заданий переполнена"})
+                return
+            if not job.done.wait(job_timeout):
+                job.cancel_token.cancel("превышено время ожидания ответа")
+                self.send_json(504, {'error': "Превышено время ожидания задания"})
+                return
+            if job.cancelled:
+                self.send_json(504, {'error': job.error})
+                return
+            if job.error is not None:
+                self.send_json(500, {'error': job.error})
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+            self.send_header("Content-Length", str(len(job.result)))
+            self.send_header("X-Queue-Seconds", f"{job.started_at - job.queued_at:.3f}")
+            self.send_header("X-Convert-Seconds", f"{job.finished_at - job.started_at:.3f}")
+            self.end_headers()
+            self.wfile.write(job.result)
+    return ConversionRequestHandler
+def serve(service, host="127.0.0.1", port=8765):
+    server = ThreadingHTTPServer((host, port), make_request_handler(service))
+    service.start()
+    print(f"Сервис конвертации слушает http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+SUPPORTED_EXTENSIONS = ('pdf', 'jpg', 'jpeg', 'png', 'bmp')
+def collect_batch_jobs(source, output_dir):
+    jobs = []
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for file_name in sorted(files):
+                if get_file_extension(file_name).lower() not in SUPPORTED_EXTENSIONS:
+                    continue
+                input_path = os.path.abspath(os.path.join(root, file_name))
+                relative = os.path.splitext(os.path.relpath(input_path, os.path.abspath(source)))[0] + '.docx'
+                jobs.append((input_path, os.path.abspath(os.path.join(output_dir, relative))))
+        return jobs
+    manifest_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding='utf-8') as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split('\t')
+            input_path = os.path.join(manifest_dir, parts[0])
+            if len(parts) > 1:
+                output_path = os.path.join(output_dir, parts[1])
+            else:
+                output_path = os.path.join(output_dir, os.path.splitext(os.path.basename(parts[0]))[0] + '.docx')
+            jobs.append((os.path.abspath(input_path), os.path.abspath(output_path)))
+    return jobs
+def read_batch_journal(journal_path):
+    completed = {}
+    if not os.path.exists(journal_path):
+        return completed
+    with open(journal_path, encoding='utf-8') as journal:
+        for line in journal:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('status') == 'ok' and os.path.exists(record.get('output', '')):
+                completed[record['input']] = record
+            else:
+                completed.pop(record.get('input'), None)
+    return completed
+def estimate_job_size(input_path):
+    try:
+        return count_input_pages([input_path])
+    except Exception:
+        return 0
+_batch_state = None
+def init_batch_worker(engine, ocr_options, convert_options, cache_options, budgets=None):
+    global _batch_state
+    limit_cpu_threads(ocr_options.get('cpu_threads'))
+    cache = OCRCache(**cache_options) if cache_options else None
+    _batch_state = (OCRProcessor(**ocr_options), engine, dict(convert_options, cache=cache), budgets or {})
+def batch_worker_convert(input_path, output_path):
+    processor, engine, convert_options, budgets = _batch_state
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    cancel_token = None
+    if budgets.get('job_timeout') or budgets.get('page_timeout'):
+        cancel_token = CancellationToken(budgets.get('job_timeout'), budgets.get('page_timeout'))
+    checkpoint_path = checkpoint_path_for(output_path) if budgets.get('checkpoint') else None
+    structured_format = budgets.get('structured_format')
+    structured_output = structured_path_for(output_path, structured_format) if structured_format else None
+    started = time.perf_counter()
+    with Workspace(budgets.get('temp_root'), budgets.get('temp_limit')) as workspace:
+        convert([input_path], output_path, engine=engine, ocr_processor=processor, cancel_token=cancel_token,
+                checkpoint_path=checkpoint_path, workspace=workspace, structured_output=structured_output,
+                structured_format=structured_format, **convert_options)
+    return time.perf_counter() - started
+def convert_batch(source, output_dir, engine="PaddleOCR", ocr_processor=None, workers=1, journal_path=None,
+                  cache_options=None, progress_callback=None, job_timeout=None, page_timeout=None,
+                  checkpoint=False, temp_root=None, temp_limit=None, structured_format=None, **convert_options):
+    if engine not in OCR_ENGINES:
+        raise ValueError(f"Неизвестный OCR движок: {engine}. Доступны: {', '.join(OCR_ENGINES)}")
+    ocr_processor = ocr_processor or OCRProcessor()
+    os.makedirs(output_dir, exist_ok=True)
+    journal_path = journal_path or os.path.join(output_dir, ".pdf_to_docx_journal.jsonl")
+    completed = read_batch_journal(journal_path)
+    jobs = [job for job in collect_batch_jobs(source, output_dir) if job[0] not in completed]
+    sized_jobs = sorted(((estimate_job_size(input_path), input_path, output_path)
+                         for input_path, output_path in jobs), reverse=True)
+    summary = {'documents': 0, 'skipped': len(completed), 'failed': 0, 'pages': 0, 'seconds': 0.0}
+    started = time.perf_counter()
+    with open(journal_path, 'a', encoding='utf-8') as journal, ProcessPoolExecutor(
+        max_workers=max(1, workers),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_batch_worker,
+        initargs=(engine, ocr_processor.options(), convert_options, cache_options,
+                  {'job_timeout': job_timeout, 'page_timeout': page_timeout, 'checkpoint': checkpoint,
+                   'temp_root': temp_root, 'temp_limit': temp_limit, 'structured_format': structured_format})
+    ) as executor:
+        futures = {
+            executor.submit(batch_worker_convert, input_path, output_path): (pages, input_path, output_path)
+            for pages, input_path, output_path in sized_jobs
+        }
+        for future in as_completed(futures):
+            pages, input_path, output_path = futures[future]
+            record = {'input': input_path, 'output': output_path, 'pages': pages, 'finished_at': time.time()}
+            try:
+                record['seconds'] = round(future.result(), 3)
+                record['status'] = 'ok'
+                summary['documents'] += 1
+                summary['pages'] += pages
+            except Exception as e:
+                record['status'] = 'failed'
+                record['error'] = str(e)
+                summary['failed'] += 1
+            journal.write(json.dumps(record, ensure_ascii=False) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+            if progress_callback:
+                progress_callback(record)
+    summary['seconds'] = time.perf_counter() - started
+    summary['pages_per_second'] = summary['pages'] / summary['seconds'] if summary['seconds'] else 0.0
+    return summary
+def default_output_path(paths):
+    base, _ = os.path.splitext(str(paths[0]))
+    return base + '.docx'
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="pdf_to_docx",
+        description="Конвертация PDF и изображений в DOCX с распознаванием текста. "
+                    "Без аргументов запускается графический интерфейс."
+    )
+    parser.add_argument("inputs", nargs="*", help="PDF-файлы или изображения (объединяются в один DOCX)")
+    parser.add_argument("-o", "--output", help="путь к итоговому DOCX (по умолчанию рядом с первым входным файлом)")
+    parser.add_argument("-e", "--engine", choices=OCR_ENGINES, default="PaddleOCR", help="OCR движок")
+    parser.add_argument("--no-text-layer", action="store_true",
+                        help="распознавать все страницы PDF, даже содержащие текстовый слой")
+    parser.add_argument("--queue-depth", type=int, default=2,
+                        help="число страниц в очереди между этапами растеризации, OCR и записи DOCX")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="число процессов OCR, в каждом загружается своя модель")
+    parser.add_argument("--cpu-threads", type=int, default=None,
+                        help="ограничение числа потоков вычислений на один процесс OCR")
+    parser.add_argument("--trocr-page", action="store_true",
+                        help="TrOCR: распознавать страницу целиком, без разбиения на строки")
+    parser.add_argument("--trocr-batch-size", type=int, default=16,
+                        help="TrOCR: максимальное число строк в одном пакете")
+    parser.add_argument("--trocr-quantize", action="store_true",
+                        help="TrOCR на CPU: динамическое квантование линейных слоев в int8")
+    parser.add_argument("--trocr-local-only", action="store_true",
+                        help="загружать модель TrOCR только из локального кэша, без обращения к сети")
+    parser.add_argument("--no-images", action="store_true", help="не переносить встроенные изображения PDF в DOCX")
+    parser.add_argument("--dpi", type=parse_dpi, default=300,
+                        help="разрешение растеризации сканированных страниц или 'auto' для выбора по высоте текста")
+    parser.add_argument("--page-batch", type=int, default=1,
+                        help="PaddleOCR: распознавать строки нескольких страниц общими пакетами (число страниц)")
+    parser.add_argument("--preprocess", action="store_true",
+                        help="выравнивать наклон и обрезать поля страницы перед OCR")
+    parser.add_argument("--binarize", action="store_true", help="с --preprocess: подавать в OCR черно-белое изображение")
+    parser.add_argument("--max-side", type=int, default=None,
+                        help="с --preprocess: уменьшать страницу до указанной длинной стороны, пикс.")
+    parser.add_argument("--stream-docx", action="store_true",
+                        help="писать DOCX потоково, страница за страницей, без python-docx (для очень больших документов)")
+    parser.add_argument("--cache", nargs="?", const="", default=None, metavar="PATH",
+                        help="кэшировать результаты OCR в SQLite (по умолчанию cache/ocr_cache.sqlite)")
+    parser.add_argument("--cache-size", type=int, default=512, help="предельный размер кэша OCR, МБ")
+    parser.add_argument("--profile", metavar="PATH", help="записать JSON-отчет о времени этапов, памяти и пикселях")
+    parser.add_argument("--prometheus", metavar="PATH", help="записать те же метрики в текстовом формате Prometheus")
+    parser.add_argument("--batch", metavar="SOURCE",
+                        help="пакетный режим: каталог или файл-манифест, по одному DOCX на каждый входной файл")
+    parser.add_argument("--output-dir", help="каталог для результатов пакетного режима")
+    parser.add_argument("--journal", help="журнал выполненных заданий пакетного режима для продолжения после сбоя")
+    parser.add_argument("--serve", action="store_true",
+                        help="запустить локальный HTTP-сервис с предзагруженной моделью OCR")
+    parser.add_argument("--host", default="127.0.0.1", help="адрес сервиса")
+    parser.add_argument("--port", type=int, default=8765, help="порт сервиса")
+    parser.add_argument("--max-queue", type=int, default=16, help="максимальное число заданий в очереди сервиса")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="предельное время задания, с; по истечении сохраняется DOCX из готовых страниц")
+    parser.add_argument("--page-timeout", type=float, default=None,
+                        help="предельное время обработки одной страницы, с (проверяется между страницами)")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="сохранять результаты OCR по страницам в <output>.ocr.jsonl и продолжать с них")
+    parser.add_argument("--incremental", action="store_true",
+                        help="хранить отпечатки и результаты страниц в <output>.manifest.jsonl и при повторном "
+                             "запуске распознавать только измененные страницы")
+    parser.add_argument("--structured", choices=STRUCTURED_FORMATS, default=None,
+                        help="в том же проходе писать рядом с DOCX постраничный JSON Lines (.jsonl) или hOCR (.hocr) "
+                             "с текстом, рамками, уверенностью и типами элементов")
+    parser.add_argument("--temp-dir", default=None,
+                        help="каталог для временных файлов заданий, например /dev/shm "
+                             "(по умолчанию PDF_TO_DOCX_TEMP или temp рядом со скриптом)")
+    parser.add_argument("--temp-limit", type=int, default=None, help="предельный объем временных файлов задания, МБ")
+    parser.add_argument("-q", "--quiet", action="store_true", help="не выводить прогресс")
+    return parser
+def temp_limit_bytes(args):
+    return args.temp_limit * 1024 * 1024 if args.temp_limit else None
+def ocr_processor_from_args(args):
+    preprocess = None
+    if args.preprocess:
+        preprocess = {'binarize': args.binarize, 'max_side': args.max_side}
+    return OCRProcessor(
+        cpu_threads=args.cpu_threads,
+        trocr_lines=not args.trocr_page,
+        trocr_batch_size=args.trocr_batch_size,
+        trocr_quantize=args.trocr_quantize,
+        trocr_local_only=args.trocr_local_only,
+        preprocess=preprocess,
+        page_batch=args.page_batch
+    )
+def run_batch(args):
+    if not os.path.exists(args.batch):
+        print(f"Файл не найден: {args.batch}", file=sys.stderr)
+        return 2
+    output_dir = args.output_dir or (args.batch if os.path.isdir(args.batch) else os.path.dirname(os.path.abspath(args.batch)))
+    cache_options = None
+    if args.cache is not None:
+        cache_options = {'path': args.cache or None, 'max_bytes': args.cache_size * 1024 * 1024}
+    def report_job(record):
+        if args.quiet:
             return
-        self.progress_bar.show()
-        self.progress_bar.setValue(0)
-        self.select_file_btn.setEnabled(False)
-        self.select_output_btn.setEnabled(False)
-        self.convert_btn.setEnabled(False)
-        ocr_engine = self.ocr_engine_combo.currentText()
-        self.processing_thread = ProcessingThread(
-            self.ocr_processor, 
-            self.file_paths, 
-            self.output_path,
-            ocr_engine
+        if record['status'] == 'ok':
+            print(f"{record['input']} -> {record['output']} ({record['pages']} стр., {record['seconds']:.1f} с)",
+                  file=sys.stderr)
+        else:
+            print(f"{record['input']}: ошибка: {record['error']}", file=sys.stderr)
+    try:
+        summary = convert_batch(
+            args.batch, output_dir, engine=args.engine, ocr_processor=ocr_processor_from_args(args),
+            workers=args.workers, journal_path=args.journal, cache_options=cache_options,
+            progress_callback=report_job, text_layer=not args.no_text_layer, queue_depth=args.queue_depth,
+            dpi=args.dpi, embed_images=not args.no_images, streaming_docx=args.stream_docx,
+            job_timeout=args.timeout, page_timeout=args.page_timeout, checkpoint=args.checkpoint,
+            temp_root=args.temp_dir, temp_limit=temp_limit_bytes(args), structured_format=args.structured
         )
-        self.processing_thread.progress_signal.connect(self.update_progress)
-        self.processing_thread.finished_signal.connect(self.processing_finished)
-        self.processing_thread.error_signal.connect(self.processing_error)
-        self.processing_thread.start()
-    def update_progress(self, value):
-        self.progress_bar.setValue(value)
-    def processing_finished(self, docx_path):
-        self.progress_bar.setValue(100)
-        self.select_file_btn.setEnabled(True)
-        self.select_output_btn.setEnabled(True)
-        self.convert_btn.setEnabled(True)
-        reply = QMessageBox.question(
-            self, 
-            "Обработка завершена", 
-            f"Файл успешно сохранен как:\n{self.output_path}\n\nОткрыть файл?",
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+    except Exception as e:
+        print(f"Ошибка при обработке: {str(e)}", file=sys.stderr)
+        return 1
+    print(f"Документов: {summary['documents']}, пропущено (уже готовы): {summary['skipped']}, "
+          f"ошибок: {summary['failed']}, страниц: {summary['pages']}, "
+          f"{summary['seconds']:.1f} с, {summary['pages_per_second']:.2f} стр/с")
+    return 0 if not summary['failed'] else 1
+def run_cli(argv):
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    cache = None
+    if args.cache is not None:
+        cache = OCRCache(args.cache or None, max_bytes=args.cache_size * 1024 * 1024)
+    if args.serve:
+        service = ConversionService(
+            ocr_processor_from_args(args), max_queue=args.max_queue,
+            text_layer=not args.no_text_layer, queue_depth=args.queue_depth,
+            cache=cache, dpi=args.dpi, embed_images=not args.no_images, streaming_docx=args.stream_docx,
+            job_timeout=args.timeout, page_timeout=args.page_timeout, temp_root=args.temp_dir,
+            temp_limit=temp_limit_bytes(args)
         )
-        if reply == QMessageBox.StandardButton.Yes:
-            os.startfile(self.output_path) if os.name == 'nt' else os.system(f'xdg-open "{self.output_path}"')
-        self.progress_bar.hide()
-    def processing_error(self, error_message):
-        self.progress_bar.setValue(0)
-        self.progress_bar.hide()
-        self.select_file_btn.setEnabled(True)
-        self.select_output_btn.setEnabled(True)
-        self.convert_btn.setEnabled(True)
-        QMessageBox.critical(self, "Ошибка", error_message)
-def main():
-    os.makedirs(os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"), exist_ok=True)
-    os.makedirs(os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp"), exist_ok=True)
-    app = QApplication(sys.argv)
-    app.setApplicationName("PDF/Изображение в DOCX")
-    window = MainWindow()
-    window.show()
-    sys.exit(app.exec())
+        try:
+            service.preload([args.engine])
+        except Exception as e:
+            print(f"Ошибка при обработке: {str(e)}", file=sys.stderr)
+            return 1
+        serve(service, args.host, args.port)
+        return 0
+    if args.batch:
+        if cache:
+            cache.close()
+        return run_batch(args)
+    if not args.inputs:
+        parser.error("не указаны входные файлы")
+    output = args.output or default_output_path(args.inputs)
+    for path in args.inputs:
+        if not os.path.isfile(path):
+            print(f"Файл не найден: {path}", file=sys.stderr)
+            return 2
+    def report_progress(value):
+        if not args.quiet:
+            print(f"Прогресс: {value}%", file=sys.stderr)
+    profiler = PipelineProfiler() if args.profile or args.prometheus else None
+    cancel_token = None
+    if args.timeout or args.page_timeout:
+        cancel_token = CancellationToken(args.timeout, args.page_timeout)
+    started = time.perf_counter()
+    try:
+        with Workspace(args.temp_dir, temp_limit_bytes(args)) as workspace:
+            docx_path = convert(args.inputs, output, engine=args.engine, progress_callback=report_progress,
+                                text_layer=not args.no_text_layer, queue_depth=args.queue_depth,
+                                workers=args.workers, ocr_processor=ocr_processor_from_args(args),
+                                cache=cache, dpi=args.dpi, embed_images=not args.no_images, profiler=profiler,
+                                streaming_docx=args.stream_docx, cancel_token=cancel_token,
+                                checkpoint_path=checkpoint_path_for(output) if args.checkpoint else None,
+                                manifest_path=manifest_path_for(output) if args.incremental else None,
+                                workspace=workspace,
+                                structured_output=structured_path_for(output, args.structured) if args.structured else None,
+                                structured_format=args.structured)
+    except ConversionCancelled as e:
+        print(f"{e}. Готово страниц: {e.pages_done}", file=sys.stderr)
+        if e.partial_path:
+            print(f"Частичный результат сохранен: {e.partial_path}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Ошибка при обработке: {str(e)}", file=sys.stderr)
+        return 1
+    finally:
+        if cache:
+            cache_stats = cache.stats()
+            cache.close()
+        if profiler and args.profile:
+            profiler.write_json(args.profile)
+        if profiler and args.prometheus:
+            with open(args.prometheus, 'w', encoding='utf-8') as metrics_file:
+                metrics_file.write(profiler.prometheus_text())
+    if not args.quiet:
+        print(f"Готово за {time.perf_counter() - started:.1f} с", file=sys.stderr)
+        if cache:
+            print(f"Кэш OCR: попаданий {cache_stats['hits']}, промахов {cache_stats['misses']}, "
+                  f"вытеснено {cache_stats['evictions']}, записей {cache_stats['entries']} "
+                  f"({cache_stats['bytes'] / 1024 / 1024:.1f} МБ)", file=sys.stderr)
+    print(docx_path)
+    return 0
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        from pdf_to_docx_gui import run_gui
+        return run_gui()
+    return run_cli(argv)
 if __name__ == "__main__":
-    main() 
+    sys.exit(main()) 
@@ -0,0 +1,284 @@
+import os
+import sys
+import asyncio
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton, 
+                           QFileDialog, QProgressBar, QLabel, QHBoxLayout,
+                           QMessageBox, QComboBox, QGroupBox, QGridLayout, QCheckBox)
+from PyQt6.QtCore import Qt, QMimeData, QUrl, pyqtSignal, QThread
+from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QPixmap, QIcon
+from pdf_to_docx import (OCRProcessor, PADDLE_OCR_AVAILABLE, TROCR_AVAILABLE, AsyncConverter, CancellationToken,
+                         ConversionCancelled, clean_temp_files, get_file_extension)
+class ProcessingThread(QThread):
+    progress_signal = pyqtSignal(int)
+    finished_signal = pyqtSignal(str)
+    error_signal = pyqtSignal(str)
+    cancelled_signal = pyqtSignal(str)
+    def __init__(self, ocr_processor, file_paths, output_path, ocr_engine, incremental=False):
+        super().__init__()
+        self.ocr_processor = ocr_processor
+        self.file_paths = file_paths
+        self.output_path = output_path
+        self.ocr_engine = ocr_engine
+        self.incremental = incremental
+        self.cancel_token = CancellationToken()
+    def cancel(self):
+        self.cancel_token.cancel()
+    async def convert_async(self):
+        async with AsyncConverter(self.ocr_processor, engine=self.ocr_engine,
+                                  incremental=self.incremental) as converter:
+            job = await converter.submit(self.file_paths, self.output_path, cancel_token=self.cancel_token)
+            async for event in job.events():
+                self.progress_signal.emit(event['progress'])
+            return await job.wait()
+    def run(self):
+        try:
+            docx_path = asyncio.run(self.convert_async())
+            self.finished_signal.emit(docx_path)
+        except ConversionCancelled as e:
+            if e.partial_path:
+                self.cancelled_signal.emit(f"Сохранено страниц: {e.pages_done}\n{e.partial_path}")
+            else:
+                self.cancelled_signal.emit("Ни одна страница не была обработана")
+        except Exception as e:
+            self.error_signal.emit(f"Ошибка при обработке: {str(e)}")
+class DropArea(QWidget):
+    def __init__(self, parent):
+        super().__init__()
+        self.parent = parent
+        self.setAcceptDrops(True)
+        self.setMinimumHeight(200)
+        self.setStyleSheet("border: 2px dashed #cccccc; border-radius: 5px;")
+        layout = QVBoxLayout(self)
+        icon_label = QLabel()
+        icon = parent.style().standardIcon(parent.style().StandardPixmap.SP_FileIcon)
+        icon_label.setPixmap(icon.pixmap(64, 64))
+        icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        icon_label.setStyleSheet("border: none;")
+        layout.addWidget(icon_label)
+        self.label = QLabel("Перетащите файлы сюда")
+        self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.label.setStyleSheet("border: none;")
+        layout.addWidget(self.label)
+    def dragEnterEvent(self, event: QDragEnterEvent):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+            self.setStyleSheet("background-color: #e0f7fa; border: 2px dashed #00acc1; border-radius: 5px;")
+    def dragLeaveEvent(self, event):
+        self.setStyleSheet("border: 2px dashed #cccccc; border-radius: 5px;")
+    def dropEvent(self, event: QDropEvent):
+        self.setStyleSheet("border: 2px dashed #cccccc; border-radius: 5px;")
+        file_paths = []
+        mime_data: QMimeData = event.mimeData()
+        if mime_data.hasUrls():
+            for url in mime_data.urls():
+                file_path = url.toLocalFile()
+                ext = get_file_extension(file_path)
+                if ext.lower() in ['pdf', 'jpg', 'jpeg', 'png', 'bmp']:
+                    file_paths.append(file_path)
+        if file_paths:
+            self.parent.file_paths = file_paths
+            self.parent.update_convert_button()
+            self.label.setText(f"Выбрано файлов: {len(file_paths)}")
+        event.acceptProposedAction()
+class MainWindow(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.ocr_processor = OCRProcessor()
+        self.file_paths = []
+        self.output_path = ""
+        self.init_ui()
+    def closeEvent(self, event):
+        clean_temp_files()
+        event.accept()
+    def init_ui(self):
+        self.setWindowTitle("PDF/Изображение в DOCX")
+        self.setMinimumSize(600, 400)
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        main_layout = QVBoxLayout(central_widget)
+        boxes_layout = QHBoxLayout()
+        self.input_box = QGroupBox("Выберите файл")
+        input_layout = QVBoxLayout()
+        self.input_box.setLayout(input_layout)
+        self.drop_area = DropArea(self)
+        self.drop_area.setMinimumSize(200, 200)
+        input_layout.addWidget(self.drop_area)
+        self.select_file_btn = QPushButton("Выбрать файл")
+        self.select_file_btn.setIcon(self.style().standardIcon(self.style().StandardPixmap.SP_DialogOpenButton))
+        self.select_file_btn.clicked.connect(self.select_files)
+        input_layout.addWidget(self.select_file_btn)
+        self.output_box = QGroupBox("Выберите путь сохранения")
+        output_layout = QVBoxLayout()
+        self.output_box.setLayout(output_layout)
+        icon_label = QLabel()
+        icon = self.style().standardIcon(self.style().StandardPixmap.SP_FileDialogNewFolder)
+        icon_label.setPixmap(icon.pixmap(64, 64))
+        icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        output_layout.addWidget(icon_label)
+        self.output_path_label = QLabel("Путь не выбран")
+        self.output_path_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.output_path_label.setWordWrap(True)
+        output_layout.addWidget(self.output_path_label)
+        self.select_output_btn = QPushButton("Выбрать путь")
+        self.select_output_btn.setIcon(self.style().standardIcon(self.style().StandardPixmap.SP_DialogSaveButton))
+        self.select_output_btn.clicked.connect(self.select_output_path)
+        output_layout.addWidget(self.select_output_btn)
+        boxes_layout.addWidget(self.input_box)
+        boxes_layout.addWidget(self.output_box)
+        main_layout.addLayout(boxes_layout)
+        self.ocr_engine_combo = QComboBox()
+        if PADDLE_OCR_AVAILABLE:
+            self.ocr_engine_combo.addItem("PaddleOCR")
+        if TROCR_AVAILABLE:
+            self.ocr_engine_combo.addItem("TrOCR")
+        self.ocr_engine_combo.hide()  
+        self.incremental_check = QCheckBox("Распознавать только измененные страницы (манифест с текстом рядом с DOCX)")
+        main_layout.addWidget(self.incremental_check)
+        self.convert_btn = QPushButton("Конвертировать")
+        self.convert_btn.setEnabled(False)
+        self.convert_btn.clicked.connect(self.process_files)
+        self.convert_btn.setMinimumHeight(50)  
+        self.convert_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #2196F3;
+                color: white;
+                font-size: 16px;
+                font-weight: bold;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #0D47A1;
+            }
+            QPushButton:disabled {
+                background-color: #BDBDBD;
+            }
+        """)
+        main_layout.addWidget(self.convert_btn)
+        self.cancel_btn = QPushButton("Отменить")
+        self.cancel_btn.clicked.connect(self.cancel_processing)
+        main_layout.addWidget(self.cancel_btn)
+        self.cancel_btn.hide()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+        main_layout.addWidget(self.progress_bar)
+        self.progress_bar.hide()  
+        self.status_label = QLabel()
+        main_layout.addWidget(self.status_label)
+        self.status_label.hide()  
+    def select_files(self):
+        file_dialog = QFileDialog()
+        file_paths, _ = file_dialog.getOpenFileNames(
+            self,
+            "Выберите файлы",
+            "",
+            "Все поддерживаемые форматы (*.pdf *.jpg *.jpeg *.png *.bmp);;PDF файлы (*.pdf);;Изображения (*.jpg *.jpeg *.png *.bmp)"
+        )
+        if file_paths:
+            self.file_paths = file_paths
+            self.drop_area.label.setText(f"Выбрано файлов: {len(file_paths)}")
+            self.update_convert_button()
+    def select_output_path(self):
+        output_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Сохранить DOCX файл",
+            "",
+            "DOCX файлы (*.docx)"
+        )
+        if output_path:
+            if not output_path.endswith('.docx'):
+                output_path += '.docx'
+            self.output_path = output_path
+            path_parts = os.path.split(output_path)
+            display_path = f".../{path_parts[1]}"
+            self.output_path_label.setText(display_path)
+            self.update_convert_button()
+    def update_convert_button(self):
+        self.convert_btn.setEnabled(bool(self.file_paths) and bool(self.output_path))
+    def process_files(self):
+        if not self.file_paths or not self.output_path:
+            QMessageBox.warning(self, "Предупреждение", "Выберите файлы и путь сохранения")
+            return
+        self.progress_bar.show()
+        self.progress_bar.setValue(0)
+        self.select_file_btn.setEnabled(False)
+        self.select_output_btn.setEnabled(False)
+        self.convert_btn.setEnabled(False)
+        ocr_engine = self.ocr_engine_combo.currentText()
+        self.processing_thread = ProcessingThread(
+            self.ocr_processor, 
+            self.file_paths, 
+            self.output_path,
+            ocr_engine,
+            self.incremental_check.isChecked()
+        )
+        self.processing_thread.progress_signal.connect(self.update_progress)
+        self.processing_thread.finished_signal.connect(self.processing_finished)
+        self.processing_thread.error_signal.connect(self.processing_error)
+        self.processing_thread.cancelled_signal.connect(self.processing_cancelled)
+        self.cancel_btn.setEnabled(True)
+        self.cancel_btn.show()
+        self.processing_thread.start()
+    def cancel_processing(self):
+        self.cancel_btn.setEnabled(False)
+        self.status_label.setText("Отмена: дожидаемся окончания текущей страницы...")
+        self.status_label.show()
+        self.processing_thread.cancel()
+    def update_progress(self, value):
+        self.progress_bar.setValue(value)
+    def processing_finished(self, docx_path):
+        self.progress_bar.setValue(100)
+        self.cancel_btn.hide()
+        self.status_label.hide()
+        self.select_file_btn.setEnabled(True)
+        self.select_output_btn.setEnabled(True)
+        self.convert_btn.setEnabled(True)
+        reply = QMessageBox.question(
+            self, 
+            "Обработка завершена", 
+            f"Файл успешно сохранен как:\n{self.output_path}\n\nОткрыть файл?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            os.startfile(self.output_path) if os.name == 'nt' else os.system(f'xdg-open "{self.output_path}"')
+        self.progress_bar.hide()
+    def processing_error(self, error_message):
+        self.progress_bar.setValue(0)
+        self.progress_bar.hide()
+        self.cancel_btn.hide()
+        self.status_label.hide()
+        self.select_file_btn.setEnabled(True)
+        self.select_output_btn.setEnabled(True)
+        self.convert_btn.setEnabled(True)
+        QMessageBox.critical(self, "Ошибка", error_message)
+    def processing_cancelled(self, message):
+        self.progress_bar.setValue(0)
+        self.progress_bar.hide()
+        self.cancel_btn.hide()
+        self.status_label.hide()
+        self.select_file_btn.setEnabled(True)
+        self.select_output_btn.setEnabled(True)
+        self.convert_btn.setEnabled(True)
+        QMessageBox.information(self, "Конвертация отменена", message)
+def check_ocr_engines():
+    if not PADDLE_OCR_AVAILABLE:
+        print("PaddleOCR не установлен. Будет доступен только TrOCR.")
+    if not TROCR_AVAILABLE:
+        print("TrOCR не установлен. Будет доступен только PaddleOCR.")
+    if not PADDLE_OCR_AVAILABLE and not TROCR_AVAILABLE:
+        print("ОШИБКА: Ни один из OCR движков (PaddleOCR, TrOCR) не установлен.")
+        print("Установите хотя бы один из них:")
+        print("pip install paddleocr paddlepaddle")
+        print("pip install transformers")
+        sys.exit(1)
+def run_gui():
+    check_ocr_engines()
+    os.makedirs(os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"), exist_ok=True)
+    os.makedirs(os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp"), exist_ok=True)
+    app = QApplication(sys.argv)
+    app.setApplicationName("PDF/Изображение в DOCX")
+    window = MainWindow()
+    window.show()
+    sys.exit(app.exec())
+if __name__ == "__main__":
+    run_gui() 